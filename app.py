@@ -1,20 +1,44 @@
 import os
 import json
+import queue
 import logging
 import secrets
+import threading
 import subprocess
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+from flask import Flask, Response, render_template, stream_template, get_flashed_messages, request, redirect, url_for, session, flash, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.jobstores.base import ConflictingIdError
 import atexit
-
-from stats import get_user_stats, update_user_stats, get_match_stats_html
-from market import MarketManager, assign_market_farmers_to_roles, run_market_matchday
+import functools
+import importlib
+
+from stats import (STATS_FILE, HISTORY_PAGE_SIZE, load_stats, save_stats, get_user_stats, update_user_stats, get_match_stats_html,
+                   get_match_history_page, get_farmer_totals, iter_history_fragments, get_cycle_points,
+                   get_entry_points)
+from market import (MarketManager, run_market_matchday, load_market_board, build_market_board,
+                    update_market_board_after_swap, get_market_board_file, get_market_stats_file,
+                    get_market_assignments_file, migrate_legacy_market)
 from trading import TradingManager
+from ownership import (set_team_ownership, remove_ownership_index, get_ownership_file, load_ownership_index,
+                       apply_team_ownership)
 from chat import ChatManager
+from store import data_version, make_etag, store_lock, commit, LEAGUES_FILE, load_leagues, save_leagues
+from scheduling import circle_method_schedule, verify_schedule, get_schedule_seed, get_schedule_fingerprint
+from pools import DEFAULT_POOL_FILE, get_farmer_pool, get_league_pool_file
+from draft import (read_draft_state, apply_draft_transition, make_pick, skip_pick, get_current_turn,
+                   is_draft_finished, remove_draft_state)
+from season_history import (TREND_SEASONS, get_season_history_file, load_season_history, get_last_season_stats,
+                            get_farmer_trend, remove_season_history)
+from leaderboards import LEADERBOARDS_FILE, get_season_totals, refresh_leaderboards, get_leaderboards
+from events import (event_bus, ALL_EVENTS, MATCHDAY_COMPLETED, PICK_MADE, DRAFT_READY, DRAFT_SCHEDULED,
+                    LEAGUE_MEMBERS_CHANGED, TRADE_PROPOSED, TRADE_ACCEPTED, TRADE_REJECTED, FARMER_SWAPPED)
+# continue.py can't be imported by name ('continue' is a keyword)
+season_rollover = importlib.import_module("continue")
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -47,62 +71,46 @@ def nl2br_filter(text):
 def inject_user_profile():
     return dict(get_user_profile=get_user_profile)
 
+# Finish any multi-store commit (e.g. a trade) interrupted by a crash; taking
+# the store lock rolls it forward without racing another process's commit.
+# Under the same lock, move the old global market history into league markets
+with store_lock():
+    migrate_legacy_market()
+
 # Initialize managers
-market_manager = MarketManager()
 trading_manager = TradingManager()
 chat_manager = ChatManager()
 
+# Standings only change when a matchday (and its playoff results) is committed
+@event_bus.on(MATCHDAY_COMPLETED)
+def refresh_league_leaderboard(event):
+    refresh_leaderboards([event["league_code"]])
+
+# Render the new matchday's history tables now so the next page load only reads the cache
+@event_bus.on(MATCHDAY_COMPLETED)
+def warm_match_stats(event):
+    league = load_leagues().get(event["league_code"], {})
+    for player in league.get("players", []):
+        get_match_stats_html(player)
+
 # Load farmer pool
 def load_farmer_pool(league_code=None):
-    """Load farmer pool, optionally league-specific"""
-    if league_code:
-        # Try to load league-specific farmer pool first
-        league_pool_file = f"farmer_pool_{league_code}.json"
-        try:
-            with open(league_pool_file, "r") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            pass  # Fall back to default pool
-    
-    # Load default farmer pool
-    try:
-        with open("farmer_pool.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
+    """Load farmer pool, optionally league-specific, as copies the caller may modify"""
+    return get_farmer_pool(league_code).copy_farmers()
 
 def load_farmer_pool_with_prev_stats(league_code):
     """Load farmer pool and attach previous season stats if available"""
     # Use league-specific farmer pool if available, otherwise default
     farmers = load_farmer_pool(league_code)
 
-    # Try to load previous season stats for this league
-    prev_stats_file = f"previous_szn_stats_{league_code}.json"
-    prev_stats = {}
-
-    try:
-        with open(prev_stats_file, "r") as f:
-            prev_stats = json.load(f)
-    except FileNotFoundError:
-        pass
-
-    # Attach previous season stats to each farmer
-    for farmer in farmers:
-        farmer_name = farmer["name"]
-        if farmer_name in prev_stats:
-            stats = prev_stats[farmer_name]
-            farmer["prev_season_stats"] = {
-                "total_points": stats.get("total_points", 0),
-                "total_injuries": stats.get("total_injuries", 0),
-                "games_played": stats.get("games_played", 0),
-                "was_drafted": stats.get("was_drafted", False)
-            }
-        else:
-            farmer["prev_season_stats"] = None
-
+    attach_season_history(farmers, load_season_history(league_code))
     return farmers
 
-FARMER_POOL = load_farmer_pool()  # Default pool for general use
+def attach_season_history(farmers, history):
+    """Attach last season's stats and the multi-season trend to each farmer"""
+    for farmer in farmers:
+        farmer["prev_season_stats"] = get_last_season_stats(history, farmer["name"])
+        farmer["season_trend"] = get_farmer_trend(history, farmer["name"])
 
 # User management
 USERS_FILE = "users.json"
@@ -117,16 +125,24 @@ def save_users(users):
     with open(USERS_FILE, "w") as f:
         json.dump(users, f, indent=4)
 
-def get_user_profile(username):
-    """Get user profile information including team name, profile picture, and team chant"""
-    users = load_users()
-    user_data = users.get(username, {})
+def build_user_profile(username, user_data):
+    """Build the public profile for a user from their users.json entry"""
     return {
         "team_name": user_data.get("team_name", username),
         "profile_pic": user_data.get("profile_pic", None),
         "team_chant": user_data.get("team_chant", None)
     }
 
+def get_user_profile(username):
+    """Get user profile information including team name, profile picture, and team chant"""
+    users = load_users()
+    return build_user_profile(username, users.get(username, {}))
+
+def get_user_profiles(usernames):
+    """Get profiles for several users with a single users.json read"""
+    users = load_users()
+    return {username: build_user_profile(username, users.get(username, {})) for username in set(usernames)}
+
 def update_user_profile(username, team_name=None, profile_pic=None, team_chant=None):
     """Update user profile information"""
     users = load_users()
@@ -144,18 +160,6 @@ def update_user_profile(username, team_name=None, profile_pic=None, team_chant=N
     return True
 
 # League management
-LEAGUES_FILE = "leagues.json"
-
-def load_leagues():
-    if not os.path.exists(LEAGUES_FILE):
-        return {}
-    with open(LEAGUES_FILE, "r") as f:
-        return json.load(f)
-
-def save_leagues(leagues):
-    with open(LEAGUES_FILE, "w") as f:
-        json.dump(leagues, f, indent=4)
-
 def get_user_league(username):
     leagues = load_leagues()
     for code, league in leagues.items():
@@ -163,6 +167,35 @@ def get_user_league(username):
             return league
     return None
 
+def conditional_api(*stores):
+    """Serve a JSON API with an ETag derived from the versions of the stores it reads.
+
+    Each store is a file path, or a callable taking the view's keyword
+    arguments and returning one. A matching If-None-Match is answered with
+    304 before the view runs, so unchanged polls skip all file parsing.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if "user" not in session:
+                return view(*args, **kwargs)
+
+            paths = [store(kwargs) if callable(store) else store for store in stores]
+            etag = make_etag(session["user"], request.full_path, data_version(*paths))
+
+            if request.if_none_match.contains(etag):
+                response = app.response_class(status=304)
+            else:
+                response = app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        return wrapper
+    return decorator
+
 # Market management (league-specific)
 def initialize_league_market(league_code):
     """Initialize the market for a specific league."""
@@ -189,16 +222,81 @@ def save_league_market_data(league_code, data):
 
 def reset_league_market(league_code):
     """Reset the market for a specific league (empty the file)."""
-    market_file = f"market_{league_code}.json"
-    if os.path.exists(market_file):
-        os.remove(market_file)
-        logging.info(f"Market reset for league {league_code}")
+    market_files = (
+        f"market_{league_code}.json",
+        get_market_board_file(league_code),
+        get_market_stats_file(league_code),
+        get_market_assignments_file(league_code)
+    )
+    for market_file in market_files:
+        if os.path.exists(market_file):
+            os.remove(market_file)
+    logging.info(f"Market reset for league {league_code}")
 
 # Scheduler for automated matchdays
 scheduler = BackgroundScheduler()
 scheduler.start()
 atexit.register(lambda: scheduler.shutdown())
 
+def get_first_bracket_cycle(league):
+    """First 3-game cycle that starts on or after the bracket creation point"""
+    bracket_creation_point = league.get("matchdays", 30) // 2
+    return -(-bracket_creation_point // 3)
+
+def build_matchup_table(league):
+    """Precompute {cycle: {username: opponent}} for the league (None is a bye).
+
+    Covers the regular season from matchup_schedule and, once brackets
+    exist, the bracket phase from bracket_schedules.
+    """
+    if "matchup_schedule" in league:
+        matchup_schedule = league["matchup_schedule"]
+    else:
+        matchup_schedule = generate_matchup_schedule(league)
+
+    table = {}
+    for username, opponents in matchup_schedule.items():
+        for cycle, opponent in enumerate(opponents):
+            table.setdefault(str(cycle), {})[username] = opponent
+
+    if league.get("brackets_created", False):
+        # Bracket schedules replace the regular schedule from the first bracket cycle on
+        first_bracket_cycle = get_first_bracket_cycle(league)
+        table = {cycle: opponents for cycle, opponents in table.items() if int(cycle) < first_bracket_cycle}
+        for bracket_schedule in league.get("bracket_schedules", {}).values():
+            for username, opponents in bracket_schedule.items():
+                for bracket_cycle, opponent in enumerate(opponents):
+                    table.setdefault(str(first_bracket_cycle + bracket_cycle), {})[username] = opponent
+
+    return table
+
+def get_matchup_sources_fingerprint(league):
+    """Fingerprint of the schedules a league's matchup table is built from"""
+    sources = {"regular": league.get("matchup_schedule", {})}
+    if league.get("brackets_created", False):
+        sources["brackets"] = league.get("bracket_schedules", {})
+    return get_schedule_fingerprint(sources)
+
+def refresh_matchup_table(league):
+    """Rebuild and store the league's matchup table along with the fingerprint of its sources"""
+    if "matchup_schedule" not in league:
+        league["matchup_schedule"] = generate_matchup_schedule(league)
+    league["matchup_table"] = build_matchup_table(league)
+    league["matchup_fingerprint"] = get_matchup_sources_fingerprint(league)
+
+def set_matchup_schedule(league):
+    """Regenerate the regular-season schedule and the matchup table built from it"""
+    league["matchup_schedule"] = generate_matchup_schedule(league)
+    refresh_matchup_table(league)
+
+def get_scheduled_opponent(league, username, cycle):
+    """Opponent for a user in a 0-indexed cycle, or None for a bye"""
+    table = league.get("matchup_table")
+    if table is None:
+        # League saved before matchup tables existed; build in memory, never write on a read
+        table = build_matchup_table(league)
+    return table.get(str(cycle), {}).get(username)
+
 def get_current_matchup(username, league):
     """Get the current opponent for a user in a playoff league"""
     if not league.get("use_playoffs", True):
@@ -208,110 +306,21 @@ def get_current_matchup(username, league):
     if len(players) < 2:
         return None
 
-    # Use global matchday to determine which 3-game cycle we're in
-    global_matchday = get_global_matchday()
-
-    # Each matchup lasts 3 matchdays
-    cycle = global_matchday // 3
-
     if username not in players:
         return None
 
-    matchdays_limit = league.get("matchdays", 30)
-    bracket_creation_point = matchdays_limit // 2
-
-    # Check if we're in the bracket phase
-    if global_matchday >= bracket_creation_point and league.get("brackets_created", False):
-        # Use bracket schedules
-        brackets = league.get("playoff_brackets", {})
-        bracket_schedules = league.get("bracket_schedules", {})
-
-        # Find which bracket the player is in
-        player_bracket = None
-        if username in brackets.get("winners", []):
-            player_bracket = "winners"
-        elif username in brackets.get("losers", []):
-            player_bracket = "losers"
-
-        if player_bracket and player_bracket in bracket_schedules:
-            bracket_schedule = bracket_schedules[player_bracket]
-            if username in bracket_schedule:
-                # Adjust cycle index for bracket phase
-                bracket_cycle = cycle - (bracket_creation_point // 3)
-                if bracket_cycle >= 0 and bracket_cycle < len(bracket_schedule[username]):
-                    return bracket_schedule[username][bracket_cycle]
-    else:
-        # Use regular pre-bracket schedule
-        # Get or initialize matchup schedule for this league
-        if "matchup_schedule" not in league:
-            league["matchup_schedule"] = generate_matchup_schedule(league)
-            # Save the updated league data
-            leagues = load_leagues()
-            leagues[league["code"]] = league
-            save_leagues(leagues)
-
-        # Find the opponent for this user and cycle
-        schedule = league["matchup_schedule"]
-        if username in schedule and cycle < len(schedule[username]):
-            return schedule[username][cycle]
-
-    return None
+    # Each matchup lasts 3 matchdays
+    cycle = get_global_matchday() // 3
+    return get_scheduled_opponent(league, username, cycle)
 
 def generate_matchup_schedule(league):
-    """Generate a round-robin matchup schedule ensuring proper rotation and bye weeks"""
+    """Generate the regular-season round-robin, the same in every process for a given league"""
     players = league.get("players", [])
-    matchdays_limit = league.get("matchdays", 30)
-    total_cycles = matchdays_limit // 3
-
-    if len(players) < 2:
-        return {players[0]: [None] * total_cycles} if players else {}
-
-    schedule = {}
-    for player in players:
-        schedule[player] = []
-
-    # Create round-robin rotation
-    import random
-    random.seed(hash(league["code"]))  # Consistent seeding based on league
-
-    # If odd number of players, one player gets a bye each cycle
-    has_bye = len(players) % 2 == 1
-
-    for cycle in range(total_cycles):
-        # Create matchups for this cycle
-        available_players = players.copy()
-        cycle_matchups = []
-
-        # If odd number of players, one gets bye
-        if has_bye:
-            bye_player = available_players[cycle % len(available_players)]
-            available_players.remove(bye_player)
-            schedule[bye_player].append(None)  # Bye week
-
-        # Pair up remaining players
-        while len(available_players) >= 2:
-            # For round-robin, use deterministic pairing based on cycle
-            if cycle == 0:
-                # First cycle: pair in order
-                player1 = available_players.pop(0)
-                player2 = available_players.pop(0)
-            else:
-                # Subsequent cycles: rotate pairings
-                player1 = available_players.pop(0)
-                # Pick opponent based on cycle to ensure variety
-                opponent_index = cycle % len(available_players) if available_players else 0
-                if opponent_index >= len(available_players):
-                    opponent_index = 0
-                player2 = available_players.pop(opponent_index)
-
-            # Add mutual matchup
-            cycle_matchups.append((player1, player2))
-
-        # Assign the matchups
-        for player1, player2 in cycle_matchups:
-            schedule[player1].append(player2)
-            schedule[player2].append(player1)
+    total_cycles = league.get("matchdays", 30) // 3
+    schedule = circle_method_schedule(players, total_cycles, get_schedule_seed(league["code"]))
 
+    if not verify_schedule(schedule):
+        logging.error(f"Generated an invalid matchup schedule for league {league['code']}")
     return schedule
 
 def get_matchup_progress(username, league):
@@ -329,15 +338,21 @@ def get_matchup_progress(username, league):
         "games_remaining": 3 - games_in_cycle if games_in_cycle > 0 else 3
     }
 
-def create_playoff_brackets(league_code):
-    """Create playoff brackets after half the matchdays are completed"""
-    leagues = load_leagues()
+def create_playoff_brackets(league_code, leagues=None, all_stats=None):
+    """Create playoff brackets after half the matchdays are completed.
+
+    When `leagues` is passed the brackets are added to it in memory and the
+    caller saves; returns True if brackets were created.
+    """
+    save = leagues is None
+    if leagues is None:
+        leagues = load_leagues()
     if league_code not in leagues:
-        return
+        return False
 
     league = leagues[league_code]
     if not league.get("use_playoffs", True):
-        return
+        return False
 
     players = league.get("players", [])
     matchdays_limit = league.get("matchdays", 30)
@@ -350,17 +365,11 @@ def create_playoff_brackets(league_code):
         playoff_records = league.get("playoff_records", {})
 
         # Sort players by wins (descending), then by total points as tiebreaker
-        def get_total_points(username):
-            user_data = get_user_stats(username)
-            total_points = sum(
-                sum(farmer["points_after_catastrophe"] for farmer in day["farmers"])
-                for day in user_data.get("data", [])
-            )
-            return total_points
+        season_totals = get_season_totals(all_stats if all_stats is not None else load_stats())
 
         sorted_players = sorted(players, key=lambda p: (
             playoff_records.get(p, {"wins": 0})["wins"],
-            get_total_points(p)
+            season_totals.get(p, 0)
         ), reverse=True)
 
         # Split into brackets
@@ -376,305 +385,266 @@ def create_playoff_brackets(league_code):
 
         # Generate new round-robin schedules for each bracket
         league["bracket_schedules"] = {
-            "winners": generate_bracket_schedule(winners_bracket, matchdays_limit - bracket_creation_point),
-            "losers": generate_bracket_schedule(losers_bracket, matchdays_limit - bracket_creation_point)
+            "winners": generate_bracket_schedule(winners_bracket, matchdays_limit - bracket_creation_point,
+                                                 get_schedule_seed(league_code, "winners")),
+            "losers": generate_bracket_schedule(losers_bracket, matchdays_limit - bracket_creation_point,
+                                                get_schedule_seed(league_code, "losers"))
         }
+        refresh_matchup_table(league)
 
         leagues[league_code] = league
-        save_leagues(leagues)
+        if save:
+            save_leagues(leagues)
 
         logging.info(f"Playoff brackets created for league {league_code}")
         logging.info(f"Winners bracket: {winners_bracket}")
         logging.info(f"Losers bracket: {losers_bracket}")
+        return True
 
-def generate_bracket_schedule(players, remaining_matchdays):
-    """Generate round-robin schedule for a bracket"""
-    if len(players) < 2:
-        return {players[0]: [None] * (remaining_matchdays // 3)} if players else {}
-
-    schedule = {}
-    for player in players:
-        schedule[player] = []
-
-    total_cycles = remaining_matchdays // 3
-    has_bye = len(players) % 2 == 1
-
-    for cycle in range(total_cycles):
-        available_players = players.copy()
+    return False
 
-        # Handle bye week for odd number of players
-        if has_bye:
-            bye_player = available_players[cycle % len(available_players)]
-            available_players.remove(bye_player)
-            schedule[bye_player].append(None)
-
-        # Create round-robin pairings
-        while len(available_players) >= 2:
-            if cycle == 0:
-                player1 = available_players.pop(0)
-                player2 = available_players.pop(0)
-            else:
-                player1 = available_players.pop(0)
-                opponent_index = cycle % len(available_players) if available_players else 0
-                if opponent_index >= len(available_players):
-                    opponent_index = 0
-                player2 = available_players.pop(opponent_index)
-
-            schedule[player1].append(player2)
-            schedule[player2].append(player1)
+def generate_bracket_schedule(players, remaining_matchdays, seed=None):
+    """Generate round-robin schedule for a bracket"""
+    schedule = circle_method_schedule(players, remaining_matchdays // 3, seed)
 
+    if not verify_schedule(schedule):
+        logging.error(f"Generated an invalid bracket schedule for {players}")
     return schedule
 
+def get_matchup_key(player, opponent):
+    """Ledger key for one pairing in a cycle (alphabetical, or a bye)"""
+    if opponent is None:
+        return f"{player}_bye"
+    first, second = sorted([player, opponent])
+    return f"{first}_vs_{second}"
+
+def get_playoff_ledger(league):
+    """Get the league's {cycle: {matchup key: result}} ledger, migrating the old recorded_matchups list"""
+    ledger = league.setdefault("playoff_ledger", {})
+    for matchup_id in league.pop("recorded_matchups", []):
+        matchup_key, _, cycle = matchup_id.rpartition("_cycle_")
+        ledger.setdefault(cycle, {}).setdefault(matchup_key, None)
+    return ledger
+
 def update_playoff_records(league_code):
-    """Update win/loss/tie records after completing a 3-game matchup"""
-    leagues = load_leagues()
-    if league_code not in leagues:
-        return
+    """Update win/loss/tie records after completing a 3-game matchup.
+
+    Results are appended to the league's playoff ledger under the completed
+    cycle, so a cycle is only scored once and re-running is a no-op. The
+    league is read and saved under store_lock() so other leagues' changes
+    made meanwhile are kept.
+    """
+    with store_lock():
+        leagues = load_leagues()
+        if league_code not in leagues:
+            return
 
-    league = leagues[league_code]
-    if not league.get("use_playoffs", True):
-        return
+        league = leagues[league_code]
+        if not league.get("use_playoffs", True):
+            return
 
-    players = league.get("players", [])
+        players = league.get("players", [])
+        records = league.setdefault("playoff_records", {})
+        for player in players:
+            records.setdefault(player, {"wins": 0, "losses": 0, "ties": 0})
 
-    # Initialize playoff records for all players
-    if "playoff_records" not in league:
-        league["playoff_records"] = {}
+        ledger = get_playoff_ledger(league)
 
-    for player in players:
-        if player not in league["playoff_records"]:
-            league["playoff_records"][player] = {"wins": 0, "losses": 0, "ties": 0}
+        # One stats snapshot serves bracket seeding and every matchup in the cycle
+        all_stats = load_stats()
 
-    # Track which matchups have been recorded to avoid duplicates
-    if "recorded_matchups" not in league:
-        league["recorded_matchups"] = []
+        # Create brackets if needed, directly on this league dict
+        create_playoff_brackets(league_code, leagues, all_stats)
+        if league.get("matchup_fingerprint") != get_matchup_sources_fingerprint(league):
+            # Missing, or the schedules changed underneath it
+            refresh_matchup_table(league)
 
-    # Create brackets if needed
-    create_playoff_brackets(league_code)
+        # Use global matchday for consistency
+        global_matchday = get_global_matchday()
 
-    # Reload league data after potential bracket creation
-    leagues = load_leagues()
-    league = leagues[league_code]
+        # Only process if we just completed a 3-game cycle
+        if global_matchday > 0 and global_matchday % 3 == 0:
+            current_cycle = global_matchday // 3 - 1  # The cycle that was just completed (0-indexed)
+            cycle_results = ledger.setdefault(str(current_cycle), {})
 
-    # Use global matchday for consistency
-    global_matchday = get_global_matchday()
+            for player in players:
+                try:
+                    opponent = get_scheduled_opponent(league, player, current_cycle)
+                    matchup_key = get_matchup_key(player, opponent)
+                    if matchup_key in cycle_results:
+                        continue
 
-    # Only process if we just completed a 3-game cycle
-    if global_matchday > 0 and global_matchday % 3 == 0:
-        current_cycle = global_matchday // 3 - 1  # The cycle that was just completed (0-indexed)
+                    # Handle bye week (no opponent)
+                    if opponent is None:
+                        records[player]["wins"] += 1
+                        cycle_results[matchup_key] = {"winner": player}
+                        print(f"[DEBUG] {player} gets bye week win for cycle {current_cycle}")
+                        continue
 
-        # Calculate points for a specific 3-game cycle
-        def get_cycle_points(username, cycle_num):
-            try:
-                user_data = get_user_stats(username)
-                all_data = user_data.get("data", [])
+                    # Ensure opponent exists in playoff records
+                    records.setdefault(opponent, {"wins": 0, "losses": 0, "ties": 0})
 
-                # Get the 3 games from this specific cycle
-                start_idx = cycle_num * 3
-                end_idx = start_idx + 3
-                cycle_data = all_data[start_idx:end_idx] if start_idx < len(all_data) else []
+                    p1_points = get_cycle_points(all_stats["users"].get(player, {}), current_cycle)
+                    p2_points = get_cycle_points(all_stats["users"].get(opponent, {}), current_cycle)
 
-                total_points = 0
-                for day_data in cycle_data:
-                    for farmer in day_data.get("farmers", []):
-                        total_points += farmer.get("points_after_catastrophe", 0)
-                return total_points
-            except Exception as e:
-                print(f"[ERROR] Error getting cycle points for {username}: {e}")
-                return 0
+                    print(f"[DEBUG] Cycle {current_cycle}: {player} ({p1_points}) vs {opponent} ({p2_points})")
 
-        # Process each player for this completed cycle
-        processed_matchups = set()
+                    if p1_points > p2_points:
+                        winner = player
+                        records[player]["wins"] += 1
+                        records[opponent]["losses"] += 1
+                        print(f"[DEBUG] {player} wins!")
+                    elif p2_points > p1_points:
+                        winner = opponent
+                        records[opponent]["wins"] += 1
+                        records[player]["losses"] += 1
+                        print(f"[DEBUG] {opponent} wins!")
+                    else:
+                        winner = None
+                        records[player]["ties"] += 1
+                        records[opponent]["ties"] += 1
+                        print(f"[DEBUG] Tie game!")
+
+                    cycle_results[matchup_key] = {
+                        "points": {player: p1_points, opponent: p2_points},
+                        "winner": winner
+                    }
 
-        for player in players:
-            try:
-                # Get opponent for this cycle using the appropriate schedule
-                opponent = None
-                matchdays_limit = league.get("matchdays", 30)
-                bracket_creation_point = matchdays_limit // 2
-
-                if global_matchday < bracket_creation_point:
-                    # Use regular matchup schedule before brackets
-                    if "matchup_schedule" in league and player in league["matchup_schedule"]:
-                        schedule = league["matchup_schedule"][player]
-                        if current_cycle < len(schedule):
-                            opponent = schedule[current_cycle]
-                else:
-                    # Use bracket schedules after bracket creation
-                    brackets = league.get("playoff_brackets", {})
-                    bracket_schedules = league.get("bracket_schedules", {})
-
-                    # Find which bracket the player is in
-                    player_bracket = None
-                    if player in brackets.get("winners", []):
-                        player_bracket = "winners"
-                    elif player in brackets.get("losers", []):
-                        player_bracket = "losers"
-
-                    if player_bracket and player_bracket in bracket_schedules:
-                        bracket_schedule = bracket_schedules[player_bracket]
-                        if player in bracket_schedule:
-                            # Adjust cycle index for bracket phase
-                            bracket_cycle = current_cycle - (bracket_creation_point // 3)
-                            if bracket_cycle >= 0 and bracket_cycle < len(bracket_schedule[player]):
-                                opponent = bracket_schedule[player][bracket_cycle]
-
-                # Handle bye week (no opponent)
-                if opponent is None:
-                    bye_matchup_id = f"{player}_bye_cycle_{current_cycle}"
-                    if bye_matchup_id not in league["recorded_matchups"]:
-                        league["playoff_records"][player]["wins"] += 1
-                        league["recorded_matchups"].append(bye_matchup_id)
-                        print(f"[DEBUG] {player} gets bye week win for cycle {current_cycle}")
+                except Exception as e:
+                    print(f"[ERROR] Error processing playoff records for {player}: {e}")
                     continue
 
-                # Ensure opponent exists in playoff records
-                if opponent not in league["playoff_records"]:
-                    league["playoff_records"][opponent] = {"wins": 0, "losses": 0, "ties": 0}
+        leagues[league_code] = league
+        save_leagues(leagues)
+        return leagues
 
-                # Create consistent matchup ID (alphabetical order)
-                matchup_players = sorted([player, opponent])
-                matchup_id = f"{matchup_players[0]}_vs_{matchup_players[1]}_cycle_{current_cycle}"
+def compute_final_standings(league, league_stats):
+    """Pick the league winner and order the final standings from records and season points"""
+    # Determine winner based on league system
+    if league.get("use_playoffs", True):
+        # Playoff system: winner has most wins FROM WINNERS BRACKET ONLY
+        playoff_records = league.get("playoff_records", {})
+        if playoff_records and any(record["wins"] > 0 or record["losses"] > 0 or record["ties"] > 0 for record in playoff_records.values()):
+            # Check if brackets have been created
+            brackets = league.get("playoff_brackets", {})
+            winners_bracket = brackets.get("winners", [])
 
-                # Skip if already processed in this function call
-                if matchup_id in processed_matchups:
-                    continue
+            if winners_bracket:
+                # Only consider players from the winners bracket for league victory
+                winner = max(winners_bracket, key=lambda x: (
+                    playoff_records.get(x, {"wins": 0})["wins"], 
+                    league_stats.get(x, 0)  # Tiebreaker: total points
+                ))
+            else:
+                # If no brackets created yet, use all players (pre-bracket phase)
+                winner = max(playoff_records.keys(), key=lambda x: (
+                    playoff_records[x]["wins"], 
+                    league_stats.get(x, 0)  # Tiebreaker: total points
+                ))
+
+            # Sort by wins for final standings with proper bracket priority
+            final_standings = []
+            brackets = league.get("playoff_brackets", {})
+            winners_bracket = brackets.get("winners", [])
+            losers_bracket = brackets.get("losers", [])
 
-                # Skip if already recorded
-                if matchup_id in league["recorded_matchups"]:
-                    continue
+            # Champion goes first
+            champion_entry = None
+            for player in league["players"]:
+                player_record = playoff_records.get(player, {"wins": 0, "losses": 0, "ties": 0})
+                entry = (player, league_stats.get(player, 0), player_record)
 
-                # Calculate points for both players
-                p1_points = get_cycle_points(player, current_cycle)
-                p2_points = get_cycle_points(opponent, current_cycle)
-
-                print(f"[DEBUG] Cycle {current_cycle}: {player} ({p1_points}) vs {opponent} ({p2_points})")
-
-                # Update records - only record once per matchup
-                if p1_points > p2_points:
-                    league["playoff_records"][player]["wins"] += 1
-                    league["playoff_records"][opponent]["losses"] += 1
-                    print(f"[DEBUG] {player} wins!")
-                elif p2_points > p1_points:
-                    league["playoff_records"][opponent]["wins"] += 1
-                    league["playoff_records"][player]["losses"] += 1
-                    print(f"[DEBUG] {opponent} wins!")
+                if player == winner:
+                    champion_entry = entry
                 else:
-                    league["playoff_records"][player]["ties"] += 1
-                    league["playoff_records"][opponent]["ties"] += 1
-                    print(f"[DEBUG] Tie game!")
-
-                # Mark this matchup as recorded
-                league["recorded_matchups"].append(matchup_id)
-                processed_matchups.add(matchup_id)
+                    final_standings.append(entry)
+
+            # Sort remaining players: winners bracket first (by wins desc), then losers bracket (by wins desc)
+            def get_sort_key(x):
+                player, points, record = x
+                wins = record["wins"]
+
+                if player in winners_bracket:
+                    # Winners bracket: higher priority (1), then by wins desc, then by points desc
+                    return (1, wins, points)
+                elif player in losers_bracket:
+                    # Losers bracket: lower priority (0), then by wins desc, then by points desc
+                    return (0, wins, points)
+                else:
+                    # No bracket (shouldn't happen but handle gracefully)
+                    return (0, wins, points)
 
-            except Exception as e:
-                print(f"[ERROR] Error processing playoff records for {player}: {e}")
-                continue
+            final_standings.sort(key=get_sort_key, reverse=True)
 
-    leagues[league_code] = league
-    save_leagues(leagues)
+            # Insert champion at the beginning
+            if champion_entry:
+                final_standings.insert(0, champion_entry)
+        else:
+            # Fallback to points if no playoff records exist
+            winner = max(league_stats.keys(), key=lambda x: league_stats[x]) if league_stats else league["players"][0]
+            final_standings = sorted(league_stats.items(), key=lambda x: x[1], reverse=True)
+    else:
+        # Points system: winner has most points
+        winner = max(league_stats.keys(), key=lambda x: league_stats[x]) if league_stats else league["players"][0]
+        final_standings = sorted(league_stats.items(), key=lambda x: x[1], reverse=True)
+
+    return winner, final_standings
+
+def build_archived_team(drafted_team):
+    """Copy of a drafted team with the farmer fields kept for the finished-league view"""
+    archived_team = {}
+    for role, farmer_data in drafted_team.items():
+        if isinstance(farmer_data, dict):
+            archived_team[role] = {
+                "name": farmer_data.get("name", ""),
+                "strength": farmer_data.get("strength", 5),
+                "handy": farmer_data.get("handy", 5),
+                "stamina": farmer_data.get("stamina", 5),
+                "physical": farmer_data.get("physical", 5),
+                "image": farmer_data.get("image", ""),
+                "crop_preferences": farmer_data.get("crop_preferences", {})
+            }
+    return archived_team
 
 def check_and_finish_league(league_code):
-    """Check if a league should be finished and handle completion"""
+    """Check if a league should be finished and handle completion.
+
+    Finishing reads stats and users once, then writes the archived league
+    and every player's reset in a single commit.
+    """
     leagues = load_leagues()
     if league_code not in leagues:
         return
 
-    league = leagues[league_code]
-    matchdays_limit = league.get("matchdays", 30)
-
     # Update playoff records first
-    if league.get("use_playoffs", True):
+    if leagues[league_code].get("use_playoffs", True):
         update_playoff_records(league_code)
-        leagues = load_leagues()  # Reload after update
-        league = leagues[league_code]
 
-    # Get the highest matchday count from any player in the league
-    max_matchday = 0
-    league_stats = {}
-
-    for player in league["players"]:
-        user_data = get_user_stats(player)
-        player_matchday = user_data.get("matchday", 0)
-        max_matchday = max(max_matchday, player_matchday)
-
-        # Calculate total points for leaderboard
-        total_points = 0
-        for entry in user_data.get("data", []):
-            for farmer in entry["farmers"]:
-                total_points += farmer["points_after_catastrophe"]
-        league_stats[player] = total_points
-
-    # Check if league should finish
-    if max_matchday >= matchdays_limit:
-        # Determine winner based on league system
-        if league.get("use_playoffs", True):
-            # Playoff system: winner has most wins FROM WINNERS BRACKET ONLY
-            playoff_records = league.get("playoff_records", {})
-            if playoff_records and any(record["wins"] > 0 or record["losses"] > 0 or record["ties"] > 0 for record in playoff_records.values()):
-                # Check if brackets have been created
-                brackets = league.get("playoff_brackets", {})
-                winners_bracket = brackets.get("winners", [])
-
-                if winners_bracket:
-                    # Only consider players from the winners bracket for league victory
-                    winner = max(winners_bracket, key=lambda x: (
-                        playoff_records.get(x, {"wins": 0})["wins"], 
-                        league_stats.get(x, 0)  # Tiebreaker: total points
-                    ))
-                else:
-                    # If no brackets created yet, use all players (pre-bracket phase)
-                    winner = max(playoff_records.keys(), key=lambda x: (
-                        playoff_records[x]["wins"], 
-                        league_stats.get(x, 0)  # Tiebreaker: total points
-                    ))
-
-                # Sort by wins for final standings with proper bracket priority
-                final_standings = []
-                brackets = league.get("playoff_brackets", {})
-                winners_bracket = brackets.get("winners", [])
-                losers_bracket = brackets.get("losers", [])
-
-                # Champion goes first
-                champion_entry = None
-                for player in league["players"]:
-                    player_record = playoff_records.get(player, {"wins": 0, "losses": 0, "ties": 0})
-                    entry = (player, league_stats.get(player, 0), player_record)
-
-                    if player == winner:
-                        champion_entry = entry
-                    else:
-                        final_standings.append(entry)
-
-                # Sort remaining players: winners bracket first (by wins desc), then losers bracket (by wins desc)
-                def get_sort_key(x):
-                    player, points, record = x
-                    wins = record["wins"]
-
-                    if player in winners_bracket:
-                        # Winners bracket: higher priority (1), then by wins desc, then by points desc
-                        return (1, wins, points)
-                    elif player in losers_bracket:
-                        # Losers bracket: lower priority (0), then by wins desc, then by points desc
-                        return (0, wins, points)
-                    else:
-                        # No bracket (shouldn't happen but handle gracefully)
-                        return (0, wins, points)
+    with store_lock():
+        # Re-read inside the lock; only this league's entry is changed below
+        leagues = load_leagues()
+        league = leagues.get(league_code)
+        if not league:
+            return
+        matchdays_limit = league.get("matchdays", 30)
 
-                final_standings.sort(key=get_sort_key, reverse=True)
+        all_stats = load_stats()
+        players_data = {
+            player: all_stats["users"].get(player, {"matchday": 0, "drafted_team": {}, "data": []})
+            for player in league["players"]
+        }
 
-                # Insert champion at the beginning
-                if champion_entry:
-                    final_standings.insert(0, champion_entry)
-            else:
-                # Fallback to points if no playoff records exist
-                winner = max(league_stats.keys(), key=lambda x: league_stats[x]) if league_stats else league["players"][0]
-                final_standings = sorted(league_stats.items(), key=lambda x: x[1], reverse=True)
-        else:
-            # Points system: winner has most points
-            winner = max(league_stats.keys(), key=lambda x: league_stats[x]) if league_stats else league["players"][0]
-            final_standings = sorted(league_stats.items(), key=lambda x: x[1], reverse=True)
+        # Get the highest matchday count from any player in the league
+        max_matchday = max((user_data.get("matchday", 0) for user_data in players_data.values()), default=0)
+        if max_matchday < matchdays_limit:
+            return
+
+        # Total points for standings, from the per-matchday totals
+        league_stats = {
+            player: sum(get_entry_points(entry) for entry in user_data.get("data", []))
+            for player, user_data in players_data.items()
+        }
+        winner, final_standings = compute_final_standings(league, league_stats)
 
         # Save final standings
         league["status"] = "finished"
@@ -683,29 +653,12 @@ def check_and_finish_league(league_code):
         league["completion_date"] = datetime.now().isoformat()
 
         # Archive teams for viewing but reset user's active team
+        user_profiles = get_user_profiles(league["players"])
         league["archived_teams"] = {}
-        for player in league["players"]:
-            user_data = get_user_stats(player)
-            user_profile = get_user_profile(player)
-
-            # Archive complete team data with all farmer information
-            archived_team = {}
-            drafted_team = user_data.get("drafted_team", {})
-
-            for role, farmer_data in drafted_team.items():
-                if isinstance(farmer_data, dict):
-                    archived_team[role] = {
-                        "name": farmer_data.get("name", ""),
-                        "strength": farmer_data.get("strength", 5),
-                        "handy": farmer_data.get("handy", 5), 
-                        "stamina": farmer_data.get("stamina", 5),
-                        "physical": farmer_data.get("physical", 5),
-                        "image": farmer_data.get("image", ""),
-                        "crop_preferences": farmer_data.get("crop_preferences", {})
-                    }
-
+        for player, user_data in players_data.items():
+            user_profile = user_profiles[player]
             league["archived_teams"][player] = {
-                "team": archived_team,
+                "team": build_archived_team(user_data.get("drafted_team", {})),
                 "final_points": league_stats[player],
                 "matchdays_played": user_data.get("matchday", 0),
                 "team_name": user_profile["team_name"],
@@ -716,19 +669,23 @@ def check_and_finish_league(league_code):
             user_data["drafted_team"] = {}
             user_data["matchday"] = 0
             user_data["data"] = []
-            update_user_stats(player, user_data)
+            all_stats["users"][player] = user_data
 
         leagues[league_code] = league
-        save_leagues(leagues)
-        logging.info(f"League {league_code} finished! Winner: {winner}")
+        commit({STATS_FILE: all_stats, LEAGUES_FILE: leagues})
+
+    logging.info(f"League {league_code} finished! Winner: {winner}")
+
+    # Reset market and team ownership for this league
+    reset_league_market(league_code)
+    remove_ownership_index(league_code)
 
-        # Reset market for this league
-        reset_league_market(league_code)
+GLOBAL_MATCHDAY_FILE = "global_matchday.json"
 
 def get_global_matchday():
     """Get the current global matchday number"""
     try:
-        with open("global_matchday.json", "r") as f:
+        with open(GLOBAL_MATCHDAY_FILE, "r") as f:
             data = json.load(f)
             return data.get("current_matchday", 0)
     except FileNotFoundError:
@@ -736,7 +693,7 @@ def get_global_matchday():
 
 def set_global_matchday(matchday):
     """Set the current global matchday number"""
-    with open("global_matchday.json", "w") as f:
+    with open(GLOBAL_MATCHDAY_FILE, "w") as f:
         json.dump({"current_matchday": matchday}, f, indent=4)
 
 def run_automated_matchday():
@@ -748,8 +705,7 @@ def run_automated_matchday():
         global_matchday = get_global_matchday()
 
         # Run market farmers first
-        assign_market_farmers_to_roles()
-        run_market_matchday()
+        run_market_matchday(load_leagues())
 
         # Get all active leagues
         leagues = load_leagues()
@@ -771,8 +727,7 @@ def run_automated_matchday():
                 if username in players_processed:
                     continue
 
-                user_data = get_user_stats(username)
-                drafted_team = user_data.get("drafted_team", {})
+                drafted_team = get_user_stats(username).get("drafted_team", {})
                 
                 # Check if all required roles are filled
                 required_roles = {"Fix Meiser", "Speed Runner", "Lift Tender"}
@@ -786,8 +741,10 @@ def run_automated_matchday():
                 if drafted_team and has_complete_team:
                     try:
                         # Set user's matchday to global matchday before running
-                        user_data["matchday"] = global_matchday
-                        update_user_stats(username, user_data)
+                        with store_lock():
+                            user_data = get_user_stats(username)
+                            user_data["matchday"] = global_matchday
+                            update_user_stats(username, user_data)
 
                         subprocess.run(["python", "core.py", username], check=True)
                         logging.info(f"Completed matchday for {username}")
@@ -806,6 +763,9 @@ def run_automated_matchday():
                 if league.get("use_playoffs", True):
                     update_playoff_records(league_code)
                 check_and_finish_league(league_code)
+
+                if any(player in players_processed for player in league["players"]):
+                    event_bus.publish(MATCHDAY_COMPLETED, league_code=league_code, matchday=global_matchday + 1)
         else:
             logging.info("No players processed matchdays - global matchday unchanged")
     except Exception as e:
@@ -820,6 +780,50 @@ scheduler.add_job(
     replace_existing=True
 )
 
+def get_rollover_job_id(league_code):
+    return f"season_rollover_{league_code}"
+
+def run_season_rollover(league_code):
+    """Scheduler job: archive, evolve and reset a finished league, resuming from its last checkpoint"""
+    try:
+        result = season_rollover.continue_league_new_season(league_code)
+        if result is None:
+            logging.info(f"Season rollover for league {league_code} is already running")
+        elif result:
+            logging.info(f"Season rollover completed for league {league_code}")
+        else:
+            status = season_rollover.load_rollover_status(league_code) or {}
+            logging.error(f"Season rollover failed for league {league_code}: {status.get('error')}")
+    except Exception as e:
+        logging.error(f"Error in season rollover for league {league_code}: {e}")
+
+def is_rollover_active(league_code):
+    """Whether a rollover job is waiting in the scheduler or running.
+
+    The scheduler drops a one-off job once it starts, so a running
+    rollover is detected by the league's rollover lock instead.
+    """
+    return (scheduler.get_job(get_rollover_job_id(league_code)) is not None
+            or season_rollover.is_rollover_running(league_code))
+
+def start_season_rollover(league_code):
+    """Queue a league's rollover on the background scheduler; False if one is already queued or running"""
+    if is_rollover_active(league_code):
+        return False
+
+    season_rollover.start_rollover_status(league_code)
+    try:
+        scheduler.add_job(
+            func=run_season_rollover,
+            args=[league_code],
+            id=get_rollover_job_id(league_code),
+            name=f"Season rollover for league {league_code}"
+        )
+    except ConflictingIdError:
+        # Queued by a concurrent request in the meantime
+        return False
+    return True
+
 @app.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
@@ -898,21 +902,13 @@ def profile():
     user_profile = get_user_profile(username)
     return render_template("profile.html", username=username, user_profile=user_profile)
 
-@app.route("/")
-def index():
-    if "user" not in session:
-        return redirect(url_for("login"))
-
-    username = session["user"]
-    tab = request.args.get("tab", "stats")
-
-    # Get user stats
-    user_data = get_user_stats(username)
-    stats_html = get_match_stats_html(username)
+# Dashboard tabs: each is rendered from its own partial, only when opened,
+# and cached per user until one of the stores it reads changes
+def build_stats_tab(username, current_league):
+    return {"stats_html": get_match_stats_html(username, limit=HISTORY_PAGE_SIZE)}
 
-    # Get story data and match history
+def build_results_tab(username, current_league):
     story_data = {}
-    match_history = []
     try:
         with open("story.json", "r") as f:
             all_stories = json.load(f)
@@ -920,246 +916,263 @@ def index():
     except:
         pass
 
-    # Get match history from user stats
-    try:
-        match_history = user_data.get("data", [])[-10:]  # Last 10 matches
-        match_history.reverse()  # Most recent first
-    except:
-        match_history = []
-
-    # Get current league
-    current_league = get_user_league(username)
-
-    # Reload league data to ensure we have latest playoff records
-    if current_league:
-        leagues = load_leagues()
-        current_league = leagues.get(current_league["code"], current_league)
-
-    # Get leaderboard data
-    from stats import load_stats
-    all_stats = load_stats()
+    # Get latest matchday data for catastrophe display
+    user_data = get_user_stats(username)
+    latest_matchday_data = user_data["data"][-1] if user_data.get("data") else None
 
-    # Create comprehensive leaderboard
-    global_leaderboard = []
-    league_leaderboard = []
+    return {
+        "story_message": story_data.get("story_message", "No story available yet."),
+        "catastrophe_message": story_data.get("catastrophe_message", "No catastrophe reported."),
+        "miss_days": story_data.get("miss_days", {}),
+        "latest_matchday_data": latest_matchday_data
+    }
 
-    for user, data in all_stats["users"].items():
-        total = sum(
-            sum(farmer["points_after_catastrophe"] for farmer in day["farmers"])
-            for day in data.get("data", [])
-        )
+def get_current_team(username, current_league):
+    """Get the user's drafted farmers as (team list, role -> farmer) for the draft and leagues tabs"""
+    team_data = None
+    current_team = {}
+    roles = ["Fix Meiser", "Speed Runner", "Lift Tender", "Bench 1", "Bench 2"]
 
-        user_profile = get_user_profile(user)
-        user_entry = {
-            "username": user, 
-            "team_name": user_profile["team_name"],
-            "profile_pic": user_profile["profile_pic"],
-            "total_points": total,
-            "is_current_user": user == username
-        }
+    if current_league and current_league.get("draft_complete"):
+        # Load team from league data
+        team_data = []
+        for role, farmer_data in get_user_stats(username).get("drafted_team", {}).items():
+            if isinstance(farmer_data, dict):
+                team_data.append(type("Farmer", (), farmer_data)())
+                current_team[role] = type("Farmer", (), farmer_data)()
 
-        global_leaderboard.append(user_entry)
+    # Fill empty roles with None instead of creating empty farmers
+    for role in roles:
+        if role not in current_team:
+            current_team[role] = None
 
-        # Add to league leaderboard if in same league
-        if current_league and user in current_league.get("players", []):
-            # Add playoff records if it's a playoff league
-            if current_league.get("use_playoffs", True):
-                # Reload current league to get latest playoff records
-                leagues = load_leagues()
-                updated_league = leagues.get(current_league["code"], current_league)
-                playoff_records = updated_league.get("playoff_records", {})
-
-                # Ensure playoff records exist for this user
-                if user not in playoff_records:
-                    playoff_records[user] = {"wins": 0, "losses": 0, "ties": 0}
-                    # Update the league data
-                    updated_league["playoff_records"] = playoff_records
-                    leagues[current_league["code"]] = updated_league
-                    save_leagues(leagues)
+    return team_data, current_team, roles
 
-                user_record = playoff_records.get(user, {"wins": 0, "losses": 0, "ties": 0})
-                user_entry.update({
-                    "wins": user_record["wins"],
-                    "losses": user_record["losses"],
-                    "ties": user_record["ties"]
-                })
-            league_leaderboard.append(user_entry)
+def build_draft_tab(username, current_league):
+    team_data, current_team, roles = get_current_team(username, current_league)
+    return {"team": team_data, "current_team": current_team, "roles": roles}
 
-    global_leaderboard.sort(key=lambda x: x["total_points"], reverse=True)
+def build_leaderboard_tab(username, current_league):
+    # Leaderboards are materialized at matchday commit; join display profiles here
+    global_view, league_view = get_leaderboards(current_league)
+    league_view = league_view or {"entries": [], "brackets": {"winners": [], "losers": []}}
+    profiles = get_user_profiles([entry["username"] for entry in global_view])
 
-    # Sort league leaderboard based on playoff phase and system
-    if current_league and current_league.get('use_playoffs', True):
-        if current_league.get('brackets_created', False):
-            # Playoff season: bracket-based ranking
-            brackets = current_league.get("playoff_brackets", {})
-            winners_bracket = brackets.get("winners", [])
-            losers_bracket = brackets.get("losers", [])
+    def decorate(entry):
+        user_profile = profiles[entry["username"]]
+        return dict(entry,
+            team_name=user_profile["team_name"],
+            profile_pic=user_profile["profile_pic"],
+            is_current_user=entry["username"] == username
+        )
 
-            def get_bracket_sort_key(x):
-                # Winners bracket players get priority (higher tier), then sort by wins and points
-                if x["username"] in winners_bracket:
-                    return (2, x.get("wins", 0), x["total_points"])  # Tier 2 (highest)
-                elif x["username"] in losers_bracket:
-                    return (1, x.get("wins", 0), x["total_points"])  # Tier 1 (lower)
-                else:
-                    return (0, x.get("wins", 0), x["total_points"])  # Tier 0 (shouldn't happen)
+    return {
+        "global_leaderboard": [decorate(entry) for entry in global_view],
+        "league_leaderboard": [decorate(entry) for entry in league_view["entries"]],
+        "league_brackets": {
+            tier: [decorate(entry) for entry in entries]
+            for tier, entries in league_view["brackets"].items()
+        }
+    }
 
-            league_leaderboard.sort(key=get_bracket_sort_key, reverse=True)
-        else:
-            # Regular season: sort by wins then points
-            league_leaderboard.sort(key=lambda x: (x.get("wins", 0), x["total_points"]), reverse=True)
-    else:
-        # Points system: sort by total points
-        league_leaderboard.sort(key=lambda x: x["total_points"], reverse=True)
+def build_farmer_stats_tab(username, current_league):
+    farmers = []
 
-    # Get global farmer stats for farmer stats tab
-    global_farmer_stats = []
-    if tab == 'farmer_stats':
-        farmers = []
+    # Load crop preferences
+    crop_preferences = {}
+    try:
+        with open("farmer_crop_preferences.json", "r") as f:
+            crop_preferences = json.load(f)
+    except FileNotFoundError:
+        pass
 
-        # Load crop preferences
-        crop_preferences = {}
-        try:
-            with open("farmer_crop_preferences.json", "r") as f:
-                crop_preferences = json.load(f)
-        except FileNotFoundError:
-            pass
+    if os.path.exists("farm_stats.json"):
+        with open("farm_stats.json") as f:
+            stats = json.load(f)
 
-        if os.path.exists("farm_stats.json"):
-            with open("farm_stats.json") as f:
-                stats = json.load(f)
+        farmer_summary = {}
+        current_user_team = stats["users"].get(username, {}).get("drafted_team", {})
+        current_user_totals = {}
 
-            farmer_summary = {}
-            current_user_team = stats["users"].get(username, {}).get("drafted_team", {})
-            current_user_totals = {}
+        # Calculate total points for each of your drafted farmers
+        for role, info in current_user_team.items():
+            if not info:
+                continue
+            name = info["name"]
+            total = 0
+            for match in stats["users"].get(username, {}).get("data", []):
+                for f in match.get("farmers", []):
+                    if f.get("name") == name:
+                        total += f.get("points_after_catastrophe", 0)
+            current_user_totals[role] = total
+
+        for other_user, user_data in stats.get("users", {}).items():
+            drafted = user_data.get("drafted_team", {})
+            matchdays = user_data.get("data", [])
 
-            # Calculate total points for each of your drafted farmers
-            for role, info in current_user_team.items():
+            for role, info in drafted.items():
                 if not info:
                     continue
                 name = info["name"]
-                total = 0
-                for match in stats["users"].get(username, {}).get("data", []):
+
+                if name not in farmer_summary:
+                    owner_profile = get_user_profile(other_user)
+                    farmer_summary[name] = {
+                        "name": name,
+                        "owner": other_user,
+                        "owner_team_name": owner_profile["team_name"],
+                        "role": role,
+                        "total_points": 0,
+                        "matchdays": 0,
+                        "best": 0
+                    }
+
+                for match in matchdays:
                     for f in match.get("farmers", []):
                         if f.get("name") == name:
-                            total += f.get("points_after_catastrophe", 0)
-                current_user_totals[role] = total
-
-            for other_user, user_data in stats.get("users", {}).items():
-                drafted = user_data.get("drafted_team", {})
-                matchdays = user_data.get("data", [])
+                            pts = f.get("points_after_catastrophe", 0)
+                            farmer_summary[name]["total_points"] += pts
+                            farmer_summary[name]["matchdays"] += 1
+                            if pts > farmer_summary[name]["best"]:
+                                farmer_summary[name]["best"] = pts
+
+        for f in farmer_summary.values():
+            f["average"] = round(f["total_points"] / f["matchdays"], 2) if f["matchdays"] else "-"
+
+            # Calculate point difference vs current user's farmer in same role
+            if f["owner"] != username:
+                # Find current user's farmer in the same role
+                user_farmer_points = None
+                for other_name, other_data in farmer_summary.items():
+                    if other_data["owner"] == username and other_data["role"] == f["role"]:
+                        user_farmer_points = other_data["total_points"]
+                        break
 
-                for role, info in drafted.items():
-                    if not info:
-                        continue
-                    name = info["name"]
-
-                    if name not in farmer_summary:
-                        owner_profile = get_user_profile(other_user)
-                        farmer_summary[name] = {
-                            "name": name,
-                            "owner": other_user,
-                            "owner_team_name": owner_profile["team_name"],
-                            "role": role,
-                            "total_points": 0,
-                            "matchdays": 0,
-                            "best": 0
-                        }
-
-                    for match in matchdays:
-                        for f in match.get("farmers", []):
-                            if f.get("name") == name:
-                                pts = f.get("points_after_catastrophe", 0)
-                                farmer_summary[name]["total_points"] += pts
-                                farmer_summary[name]["matchdays"] += 1
-                                if pts > farmer_summary[name]["best"]:
-                                    farmer_summary[name]["best"] = pts
-
-            for f in farmer_summary.values():
-                f["average"] = round(f["total_points"] / f["matchdays"], 2) if f["matchdays"] else "-"
-
-                # Calculate point difference vs current user's farmer in same role
-                if f["owner"] != username:
-                    # Find current user's farmer in the same role
-                    user_farmer_points = None
-                    for other_name, other_data in farmer_summary.items():
-                        if other_data["owner"] == username and other_data["role"] == f["role"]:
-                            user_farmer_points = other_data["total_points"]
-                            break
-
-                    if user_farmer_points is not None:
-                        f["vs_your_role_diff"] = f["total_points"] - user_farmer_points
-                    else:
-                        f["vs_your_role_diff"] = None
+                if user_farmer_points is not None:
+                    f["vs_your_role_diff"] = f["total_points"] - user_farmer_points
                 else:
                     f["vs_your_role_diff"] = None
+            else:
+                f["vs_your_role_diff"] = None
 
-                # Add crop preferences
-                f["crop_preferences"] = crop_preferences.get(f["name"], {})
-                farmers.append(f)
+            # Add crop preferences
+            f["crop_preferences"] = crop_preferences.get(f["name"], {})
+            farmers.append(f)
 
-        # Add crop preferences to base farmer data for farmer stats
-        all_farmers_with_prefs = []
-        for farmer in FARMER_POOL:
-            farmer_with_prefs = farmer.copy()
-            farmer_with_prefs['crop_preferences'] = crop_preferences.get(farmer['name'], {})
-            all_farmers_with_prefs.append(farmer_with_prefs)
+    # Add crop preferences to base farmer data for farmer stats
+    all_farmers_with_prefs = []
+    for farmer in get_farmer_pool(current_league["code"] if current_league else None).farmers:
+        farmer_with_prefs = farmer.copy()
+        farmer_with_prefs['crop_preferences'] = crop_preferences.get(farmer['name'], {})
+        all_farmers_with_prefs.append(farmer_with_prefs)
 
-        return render_template("index.html", tab=tab, username=username, farmers=farmers, all_farmers=all_farmers_with_prefs)
+    return {"farmers": farmers, "all_farmers": all_farmers_with_prefs}
 
-    # Get team data for draft tab
-    team_data = None
-    current_team = {}
-    roles = ["Fix Meiser", "Speed Runner", "Lift Tender", "Bench 1", "Bench 2"]
+def build_leagues_tab(username, current_league):
+    team_data, current_team, roles = get_current_team(username, current_league)
 
-    if current_league and current_league.get("draft_complete"):
-        # Load team from league data
-        team_data = []
-        for role, farmer_data in user_data.get("drafted_team", {}).items():
-            if isinstance(farmer_data, dict):
-                team_data.append(type("Farmer", (), farmer_data)())
-                current_team[role] = type("Farmer", (), farmer_data)()
+    # Get current matchup for user if in playoff league
+    current_matchup = None
+    matchup_progress = None
+    if current_league and current_league.get("use_playoffs", True) and current_league.get("draft_complete"):
+        current_matchup = get_current_matchup(username, current_league)
+        matchup_progress = get_matchup_progress(username, current_league)
 
-    # Fill empty roles with None instead of creating empty farmers
-    for role in roles:
-        if role not in current_team:
-            current_team[role] = None
+    return {
+        "current_team": current_team,
+        "current_matchup": current_matchup,
+        "matchup_progress": matchup_progress,
+        "global_matchday": get_global_matchday()
+    }
+
+def get_current_league_pool_file(current_league):
+    """The league's evolved pool file (or the default one when the user has no league)"""
+    return get_league_pool_file(current_league["code"]) if current_league else DEFAULT_POOL_FILE
+
+# Tab name -> (context builder, stores its HTML depends on besides users.json)
+INDEX_TABS = {
+    "stats": (build_stats_tab, (STATS_FILE, "farmer_crop_preferences.json")),
+    "results": (build_results_tab, (STATS_FILE, "story.json")),
+    "draft": (build_draft_tab, (STATS_FILE, LEAGUES_FILE)),
+    "leaderboard": (build_leaderboard_tab, (LEADERBOARDS_FILE, LEAGUES_FILE)),
+    "farmer_stats": (build_farmer_stats_tab, (STATS_FILE, "farmer_crop_preferences.json", LEAGUES_FILE,
+                                              DEFAULT_POOL_FILE, get_current_league_pool_file)),
+    "leagues": (build_leagues_tab, (STATS_FILE, LEAGUES_FILE, GLOBAL_MATCHDAY_FILE))
+}
+
+# (username, tab) -> (data version, rendered HTML), least recently used first
+INDEX_TAB_CACHE_SIZE = 512
+_index_tab_cache = OrderedDict()
+_index_tab_cache_lock = threading.Lock()
+
+def get_index_tab_version(tab, current_league):
+    """Version of a tab's stores; a callable store names a file for the user's league"""
+    stores = [store(current_league) if callable(store) else store for store in INDEX_TABS[tab][1]]
+    return data_version(USERS_FILE, *stores)
+
+def render_index_tab(tab, username, current_league):
+    """Render one dashboard tab, reusing the cached HTML while its stores are unchanged"""
+    version = get_index_tab_version(tab, current_league)
+    with _index_tab_cache_lock:
+        cached = _index_tab_cache.get((username, tab))
+        if cached and cached[0] == version:
+            _index_tab_cache.move_to_end((username, tab))
+            return cached[1]
+
+    build_tab, _ = INDEX_TABS[tab]
+    html = render_template(f"partials/index_{tab}.html",
+        username=username,
+        tab=tab,
+        current_league=current_league,
+        **build_tab(username, current_league)
+    )
+    with _index_tab_cache_lock:
+        _index_tab_cache[(username, tab)] = (version, html)
+        _index_tab_cache.move_to_end((username, tab))
+        while len(_index_tab_cache) > INDEX_TAB_CACHE_SIZE:
+            _index_tab_cache.popitem(last=False)
+    return html
 
-    # Get current matchup for user if in playoff league
-    current_matchup = None
-    matchup_progress = None
-    global_matchday = get_global_matchday()
+@app.route("/")
+def index():
+    if "user" not in session:
+        return redirect(url_for("login"))
 
-    if current_league and current_league.get("use_playoffs", True) and current_league.get("draft_complete"):
-        current_matchup = get_current_matchup(username, current_league)
-        matchup_progress = get_matchup_progress(username, current_league)
+    username = session["user"]
+    tab = request.args.get("tab", "stats")
+    if tab not in INDEX_TABS:
+        tab = "stats"
 
-    # Get latest matchday data for catastrophe display
-    latest_matchday_data = None
-    if user_data.get("data"):
-        latest_matchday_data = user_data["data"][-1]  # Most recent matchday
+    current_league = get_user_league(username)
 
     return render_template("index.html",
         username=username,
         tab=tab,
-        stats_html=stats_html,
-        story_message=story_data.get("story_message", "No story available yet."),
-        catastrophe_message=story_data.get("catastrophe_message", "No catastrophe reported."),
-        miss_days=story_data.get("miss_days", {}),
-        match_history=match_history,
-        global_leaderboard=global_leaderboard,
-        league_leaderboard=league_leaderboard,
-        global_farmer_stats=global_farmer_stats,
+        tab_html=render_index_tab(tab, username, current_league),
         current_league=current_league,
-        current_matchup=current_matchup,
-        matchup_progress=matchup_progress,
-        global_matchday=global_matchday,
-        team=team_data,
-        current_team=current_team,
-        roles=roles,
-        latest_matchday_data=latest_matchday_data
+        global_matchday=get_global_matchday()
     )
 
+@app.route("/partials/index/<tab>")
+def index_tab_partial(tab):
+    """A single dashboard tab's HTML, for loading or refreshing it without the page"""
+    if "user" not in session:
+        return "", 401
+    if tab not in INDEX_TABS:
+        return "", 404
+
+    username = session["user"]
+    current_league = get_user_league(username)
+    etag = make_etag(username, tab, get_index_tab_version(tab, current_league))
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.make_response(render_index_tab(tab, username, current_league))
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
 @app.route("/results")
 def results():
     return redirect(url_for("index", tab="results"))
@@ -1205,9 +1218,17 @@ def draft():
         if unassigned_farmers:
             flash(f"All drafted farmers must be assigned to a role. Unassigned: {', '.join(unassigned_farmers)}", "danger")
         else:
-            user_data["drafted_team"] = updated_assignments
-            update_user_stats(username, user_data)
-            flash("Team assignments saved successfully!", "success")
+            with store_lock():
+                # Re-read under the lock; a trade or swap since the form was built changes the roster
+                user_data = get_user_stats(username)
+                current_names = {farmer["name"] for farmer in user_data.get("drafted_team", {}).values() if farmer}
+                if current_names != all_farmer_names:
+                    flash("Your team changed while you were editing it. Please review it and try again.", "warning")
+                else:
+                    user_data["drafted_team"] = updated_assignments
+                    update_user_stats(username, user_data)
+                    set_team_ownership(current_league["code"], current_league["players"], {username: updated_assignments})
+                    flash("Team assignments saved successfully!", "success")
 
     return redirect(url_for("index", tab="draft"))
 
@@ -1246,7 +1267,7 @@ def leagues():
                 "snake_order": [],
                 "market_initialized": False,
                 "playoff_records": {},
-                "recorded_matchups": []
+                "playoff_ledger": {}
             }
 
             save_leagues(leagues)
@@ -1261,8 +1282,9 @@ def leagues():
                 if username not in league["players"]:
                     league["players"].append(username)
                     # Regenerate matchup schedule when new player joins
-                    league["matchup_schedule"] = generate_matchup_schedule(league)
+                    set_matchup_schedule(league)
                     save_leagues(leagues)
+                    event_bus.publish(LEAGUE_MEMBERS_CHANGED, league_code=code, username=username, change="joined")
                     flash(f"Joined league: {league['name']}", "success")
                 else:
                     flash("You are already in this league!", "warning")
@@ -1275,6 +1297,7 @@ def leagues():
                 if username in league["players"] and username != league["host"]:
                     league["players"].remove(username)
                     save_leagues(leagues)
+                    event_bus.publish(LEAGUE_MEMBERS_CHANGED, league_code=code, username=username, change="left")
                     flash("Left the league.", "info")
                     break
 
@@ -1287,6 +1310,8 @@ def leagues():
                 if kick_user in current_league["players"]:
                     current_league["players"].remove(kick_user)
                     save_leagues(leagues)
+                    event_bus.publish(LEAGUE_MEMBERS_CHANGED, league_code=current_league["code"], username=kick_user,
+                                      change="kicked")
                     flash(f"Kicked {kick_user} from the league.", "info")
 
         elif action == "update_settings":
@@ -1307,7 +1332,7 @@ def leagues():
                 current_league["lock_market_in_playoffs"] = lock_market_in_playoffs
 
                 # Regenerate matchup schedule with new settings
-                current_league["matchup_schedule"] = generate_matchup_schedule(current_league)
+                set_matchup_schedule(current_league)
 
                 leagues[current_league["code"]] = current_league
                 save_leagues(leagues)
@@ -1335,72 +1360,48 @@ def leagues():
                 except FileNotFoundError:
                     pass
 
-                # Clean up market stats for all players in the league
-                try:
-                    with open("market_stats.json", "r") as f:
-                        market_stats = json.load(f)
-
-                    # Remove any market farmers that were drafted by players in this league
-                    from stats import load_stats
-                    all_stats = load_stats()
-
-                    for player in players_in_league:
-                        user_data = all_stats["users"].get(player, {})
-                        for farmer_data in user_data.get("drafted_team", {}).values():
-                            if isinstance(farmer_data, dict) and farmer_data.get("name") in market_stats:
-                                del market_stats[farmer_data["name"]]
-
-                    with open("market_stats.json", "w") as f:
-                        json.dump(market_stats, f, indent=4)
-                except FileNotFoundError:
-                    pass
-
                 # Clean up farm stats for all players in the league
                 try:
-                    from stats import load_stats, save_stats
-                    all_stats = load_stats()
-
-                    for player in players_in_league:
-                        if player in all_stats["users"]:
-                            # Reset player's stats
-                            all_stats["users"][player] = {
-                                "matchday": 0,
-                                "drafted_team": {},
-                                "data": []
-                            }
-
-                    save_stats(all_stats)
+                    with store_lock():
+                        all_stats = load_stats()
+
+                        for player in players_in_league:
+                            if player in all_stats["users"]:
+                                # Reset player's stats
+                                all_stats["users"][player] = {
+                                    "matchday": 0,
+                                    "drafted_team": {},
+                                    "data": []
+                                }
+
+                        save_stats(all_stats)
                 except Exception as e:
                     logging.error(f"Error cleaning up farm stats: {e}")
 
                 # Clean up league-specific market file
                 reset_league_market(league_code)
+                remove_ownership_index(league_code)
 
-                # Clean up trade history for all players in the league
-                try:
-                    with open("trades.json", "r") as f:
-                        trades = json.load(f)
-
-                    # Remove trades involving players from this league
-                    filtered_trades = []
-                    for trade in trades:
-                        if trade["from_user"] not in players_in_league and trade["to_user"] not in players_in_league:
-                            filtered_trades.append(trade)
-
-                    with open("trades.json", "w") as f:
-                        json.dump(filtered_trades, f, indent=4)
-                except FileNotFoundError:
-                    pass
+                # Clean up trade history (pending and archived) for all players in the league
+                trading_manager.remove_user_trades(players_in_league)
 
                 # Clean up league chat
                 chat_manager.delete_league_chat(league_code)
 
+                remove_season_history(league_code)
+                remove_draft_state(league_code)
+                for rollover_file in (season_rollover.get_rollover_file(league_code),
+                                      season_rollover.get_rollover_lock_file(league_code)):
+                    if os.path.exists(rollover_file):
+                        os.remove(rollover_file)
+
                 # Reset global matchday to 0 when league is deleted
                 set_global_matchday(0)
 
                 # Remove the league
                 del leagues[league_code]
                 save_leagues(leagues)
+                refresh_leaderboards([])
                 flash("League and all associated data deleted successfully.", "info")
 
         elif action == "set_matchdays":
@@ -1412,7 +1413,7 @@ def leagues():
                 current_league["matchdays"] = matchdays
                 # Regenerate schedule with new matchday limit
                 if "matchup_schedule" in current_league:
-                    current_league["matchup_schedule"] = generate_matchup_schedule(current_league)
+                    set_matchup_schedule(current_league)
                 save_leagues(leagues)
                 flash(f"Season length updated to {matchdays} matchdays.", "success")
 
@@ -1424,7 +1425,7 @@ def leagues():
             if current_league and current_league["host"] == username:
                 current_league["playoff_cutoff"] = cutoff
                 # Regenerate schedule with new cutoff
-                current_league["matchup_schedule"] = generate_matchup_schedule(current_league)
+                set_matchup_schedule(current_league)
                 save_leagues(leagues)
                 flash(f"Playoff cutoff updated to {cutoff} players.", "success")
 
@@ -1433,17 +1434,10 @@ def leagues():
             current_league = get_user_league(username)
 
             if current_league and current_league["host"] == username and current_league.get("status") == "finished":
-                try:
-                    import importlib
-                    continue_module = importlib.import_module('continue')
-                    success = continue_module.continue_league_new_season(current_league["code"])
-
-                    if success:
-                        flash("New season started! Farmer stats have evolved based on previous performance. Ready for a new draft!", "success")
-                    else:
-                        flash("Error starting new season. Please try again.", "danger")
-                except Exception as e:
-                    flash(f"Error starting new season: {str(e)}", "danger")
+                if start_season_rollover(current_league["code"]):
+                    flash("Preparing the new season in the background. Farmer stats are evolving based on previous performance!", "success")
+                else:
+                    flash("The new season is already being prepared.", "info")
             else:
                 flash("Only the league host can start a new season, and the league must be finished.", "danger")
 
@@ -1487,6 +1481,7 @@ def start_league():
         leagues = load_leagues()
         leagues[current_league["code"]] = current_league
         save_leagues(leagues)
+        event_bus.publish(DRAFT_SCHEDULED, league_code=current_league["code"], draft_time=current_league["draft_time"])
 
         flash("League settings finalized! Draft begins in 1 minute.", "success")
 
@@ -1524,8 +1519,7 @@ def run_matchday():
         # Run matchday for all players in the league
         matchdays_run = 0
         for player in current_league["players"]:
-            user_data = get_user_stats(player)
-            drafted_team = user_data.get("drafted_team", {})
+            drafted_team = get_user_stats(player).get("drafted_team", {})
             
             # Check if all required roles are filled
             required_roles = {"Fix Meiser", "Speed Runner", "Lift Tender"}
@@ -1539,8 +1533,10 @@ def run_matchday():
             if drafted_team and has_complete_team:
                 try:
                     # Set user's matchday to global matchday before running
-                    user_data["matchday"] = global_matchday
-                    update_user_stats(player, user_data)
+                    with store_lock():
+                        user_data = get_user_stats(player)
+                        user_data["matchday"] = global_matchday
+                        update_user_stats(player, user_data)
 
                     subprocess.run(["python", "core.py", player], check=True)
                     matchdays_run += 1
@@ -1560,6 +1556,8 @@ def run_matchday():
             # Check if this completes the league's season
             check_and_finish_league(current_league["code"])
 
+            event_bus.publish(MATCHDAY_COMPLETED, league_code=current_league["code"], matchday=global_matchday + 1)
+
             flash(f"Successfully ran matchday for {matchdays_run} players! Global matchday is now {global_matchday + 1}", "success")
         else:
             flash("No players were ready for matchday.", "warning")
@@ -1703,14 +1701,19 @@ def draftroom():
         farmer["crop_preferences"] = crop_preferences.get(farmer["name"], {})
 
     # Get draft state
-    leagues = load_leagues()
-    league = leagues[league_code]
-
-    picks_made = league.get("picks_made", 0)
+    draft_state = read_draft_state(league_code, league)
+    picks_made = draft_state["picks_made"]
     snake_order = league.get("snake_order", [])
 
-    if picks_made >= len(snake_order):
+    if is_draft_finished(draft_state, snake_order):
         # Draft complete
+        leagues = load_leagues()
+        league = leagues[league_code]
+        if not league.get("draft_complete", False):
+            # Fix every regular-season pairing now so lookups never have to work it out
+            if not league.get("matchup_schedule"):
+                league["matchup_schedule"] = generate_matchup_schedule(league)
+            refresh_matchup_table(league)
         league["draft_complete"] = True
 
         # Initialize the market for the league upon draft completion
@@ -1718,28 +1721,22 @@ def draftroom():
             initialize_league_market(league_code)
             league["market_initialized"] = True  # Ensure market is not re-initialized
             save_leagues(leagues)
+            build_market_board(league_code, league["players"])
 
         save_leagues(leagues)
         flash("Draft completed!", "success")
         return redirect(url_for("index", tab="draft"))
 
-    current_user_turn = snake_order[picks_made] if picks_made < len(snake_order) else None
-
-    # Get picked farmers
-    picked_farmers = league.get("picked_farmers", [])
-# Add previous season stats to farmer data
-    for farmer in farmer_pool:
-        farmer["prev_season_stats"] = load_previous_season_stats(league_code, farmer["name"])
+    current_user_turn = get_current_turn(draft_state, snake_order)
 
     # Available roles for current pick
     roles = ["Fix Meiser", "Speed Runner", "Lift Tender", "Bench 1", "Bench 2"]
 
     # Get picked farmers
-    picked_farmers = league.get("picked_farmers", [])
-    picked_farmer_names = [f["name"] for f in picked_farmers]
+    picked_farmer_names = [f["name"] for f in draft_state["picked_farmers"]]
 
     # Get user's current draft
-    user_draft = league.get("user_drafts", {}).get(username, {})
+    user_draft = draft_state["user_drafts"].get(username, {})
 
     # Available roles for current pick
     available_roles = [role for role in roles if role not in user_draft]
@@ -1748,19 +1745,12 @@ def draftroom():
     user_draft_complete = len(user_draft) >= 5
 
     # Get pick start time
-    pick_start_time = league.get("pick_start_time", datetime.now().isoformat())
-
-    # Use league-specific farmer pool if available
-    league_farmer_pool = load_farmer_pool(league_code)
-    
-    # Add previous season stats to farmer data
-    for farmer in league_farmer_pool:
-        farmer["prev_season_stats"] = load_previous_season_stats(league_code, farmer["name"])
+    pick_start_time = draft_state.get("pick_start_time") or datetime.now().isoformat()
 
     return render_template("draftroom.html",
         username=username,
         league_code=current_league["code"],
-        farmer_pool=league_farmer_pool,
+        farmer_pool=farmer_pool,
         picked_farmer_names=picked_farmer_names,
         current_user_turn=current_user_turn,
         snake_order=snake_order,
@@ -1769,21 +1759,25 @@ def draftroom():
         available_roles=available_roles,
         user_draft_complete=user_draft_complete,
         pick_start_time=pick_start_time,
-        last_pick_message=league.get("last_pick_message", "")
+        last_pick_message=draft_state.get("last_pick_message", "")
     )
 
-def load_previous_season_stats(league_code, farmer_name):
-    """Load previous season stats for a farmer if available"""
-    prev_stats_file = f"previous_szn_stats_{league_code}.json"
-    try:
-        with open(prev_stats_file, "r") as f:
-            prev_stats = json.load(f)
-            if farmer_name in prev_stats:
-                return prev_stats[farmer_name]
-    except FileNotFoundError:
-        pass  # No previous season stats file
+@app.route("/api/season_history/<league_code>")
+@conditional_api(lambda kwargs: get_season_history_file(kwargs["league_code"]))
+def api_season_history(league_code):
+    """Multi-season trends for every farmer (or ?farmer=<name>) in a league"""
+    if "user" not in session:
+        return jsonify({}), 401
 
-    return None
+    seasons = max(1, min(request.args.get("seasons", TREND_SEASONS, type=int), 20))
+    history = load_season_history(league_code)
+    farmer_name = request.args.get("farmer")
+    farmer_names = [farmer_name] if farmer_name else sorted(history["farmers"])
+
+    return jsonify({
+        "seasons": history["seasons"][-seasons:],
+        "farmers": {name: get_farmer_trend(history, name, seasons) for name in farmer_names}
+    })
 
 @app.route("/submit_pick", methods=["POST"])
 def submit_pick():
@@ -1795,54 +1789,41 @@ def submit_pick():
     league_code = request.form["league_code"]
     selected_role = request.form["selected_role"]
 
-    leagues = load_leagues()
-    league = leagues[league_code]
-
-    # Validate it's user's turn
-    picks_made = league.get("picks_made", 0)
-    snake_order = league.get("snake_order", [])
-
-    if picks_made >= len(snake_order) or snake_order[picks_made] != username:
-        flash("It's not your turn!", "danger")
-        return redirect(url_for("draftroom"))
+    league = load_leagues().get(league_code)
+    if not league:
+        flash("League not found!", "danger")
+        return redirect(url_for("index", tab="leagues"))
 
     # Use league-specific farmer pool if available
-    league_farmer_pool = load_farmer_pool(league_code)
-
-    # Validate farmer not picked
-    picked_farmers = league.get("picked_farmers", [])
-    farmer = league_farmer_pool[farmer_index]
-
-    if any(f["name"] == farmer["name"] for f in picked_farmers):
-        flash("Farmer already picked!", "danger")
+    league_farmer_pool = get_farmer_pool(league_code).farmers
+    if not 0 <= farmer_index < len(league_farmer_pool):
+        flash("Farmer not found!", "danger")
         return redirect(url_for("draftroom"))
+    farmer = league_farmer_pool[farmer_index].copy()
 
-    # Validate role selection
-    user_drafts = league.get("user_drafts", {})
-    if username not in user_drafts:
-        user_drafts[username] = {}
-
-    if selected_role in user_drafts[username]:
-        flash("Role already filled!", "danger")
+    # Turn, farmer and role are validated against the latest draft state when the pick is saved
+    draft_state, error = apply_draft_transition(league_code, league, make_pick, username, farmer, selected_role)
+    if error:
+        flash(error, "danger")
         return redirect(url_for("draftroom"))
 
-    # Make the pick
-    picked_farmers.append(farmer)
-    user_drafts[username][selected_role] = farmer
-    league["picked_farmers"] = picked_farmers
-    league["user_drafts"] = user_drafts
-    league["picks_made"] = picks_made + 1
-    
-    # Reset timer for next player's turn
-    league["pick_start_time"] = datetime.now().isoformat()
-    league["last_pick_message"] = f"{username} selected {farmer['name']} as {selected_role}"
-
-    # Update user stats with drafted team
-    user_data = get_user_stats(username)
-    user_data["drafted_team"] = user_drafts[username]
-    update_user_stats(username, user_data)
+    # Update user stats with drafted team. farm_stats.json is shared by every
+    # league, so this is done under the store lock, and with the latest draft
+    # state in case a later pick of this user's was saved first
+    with store_lock():
+        user_data = get_user_stats(username)
+        user_data["drafted_team"] = read_draft_state(league_code, league)["user_drafts"][username]
+        update_user_stats(username, user_data)
+        set_team_ownership(league_code, league["players"], {username: user_data["drafted_team"]})
 
-    save_leagues(leagues)
+    event_bus.publish(PICK_MADE,
+        league_code=league_code,
+        username=username,
+        farmer=farmer["name"],
+        role=selected_role,
+        picks_made=draft_state["picks_made"],
+        pick_start_time=draft_state["pick_start_time"]
+    )
 
     flash(f"Successfully picked {farmer['name']} as {selected_role}!", "success")
     return redirect(url_for("draftroom"))
@@ -1856,24 +1837,23 @@ def skip_turn():
     data = request.get_json()
     league_code = data["league_code"]
 
-    leagues = load_leagues()
-    league = leagues[league_code]
-
-    # Validate it's user's turn
-    picks_made = league.get("picks_made", 0)
-    snake_order = league.get("snake_order", [])
-
-    if picks_made >= len(snake_order) or snake_order[picks_made] != username:
-        return "Not your turn", 400
+    league = load_leagues().get(league_code)
+    if not league:
+        return "League not found", 404
 
-    # Skip turn
-    league["picks_made"] = picks_made + 1
-    
-    # Reset timer for next player's turn
-    league["pick_start_time"] = datetime.now().isoformat()
-    league["last_pick_message"] = f"{username} was skipped for taking too long"
+    draft_state, error = apply_draft_transition(league_code, league, skip_pick, username, data.get("picks_made"))
+    if error:
+        return error, 400
 
-    save_leagues(leagues)
+    event_bus.publish(PICK_MADE,
+        league_code=league_code,
+        username=username,
+        farmer=None,
+        role=None,
+        skipped=True,
+        picks_made=draft_state["picks_made"],
+        pick_start_time=draft_state["pick_start_time"]
+    )
     return "Turn skipped"
 
 @app.route("/market")
@@ -1901,104 +1881,11 @@ def market():
 
     league_code = current_league["code"]
 
-    # Get market data
-    market_stats = market_manager.get_market_stats()
-
-    # Get market assignments to show suggested roles
-    try:
-        with open("market_assignments.json", "r") as f:
-            market_assignments = json.load(f)
-    except FileNotFoundError:
-        market_assignments = {}
-
-    # Get available farmers (not drafted by any user IN THIS LEAGUE)
-    from stats import load_stats
-    all_stats = load_stats()
-
-    # Use league-specific farmer pool if available
-    league_farmer_pool = load_farmer_pool(league_code)
-
-    # Get drafted farmers in the current league
-    drafted_farmers = set()
-    for player in current_league["players"]:
-        user_data = get_user_stats(player)
-        for farmer_data in user_data.get("drafted_team", {}).values():
-            if isinstance(farmer_data, dict):
-                drafted_farmers.add(farmer_data["name"])
-
-    available_farmers = []
-    all_avg_points = []
-
-    for farmer in league_farmer_pool:
-        if farmer["name"] not in drafted_farmers:
-            farmer_stats = market_stats.get(farmer["name"], {})
-
-            # Get suggested role from assignments
-            suggested_role = "Unknown"
-            if farmer["name"] in market_assignments:
-                suggested_role = market_assignments[farmer["name"]]["role"]
-            else:
-                # Calculate suggested role based on best stat
-                stats = {
-                    "Fix Meiser": farmer["handy"],
-                    "Speed Runner": farmer["stamina"], 
-                    "Lift Tender": farmer["strength"]
-                }
-                suggested_role = max(stats.keys(), key=lambda x: stats[x])
-
-            farmer_with_stats = farmer.copy()
-            farmer_with_stats.update({
-                "total_points": farmer_stats.get("total_points", 0),
-                "matchdays_played": farmer_stats.get("matchdays_played", 0),
-                "avg_points": farmer_stats.get("avg_points", 0.0),
-                "recent_form": farmer_stats.get("recent_form", []),
-                "suggested_role": suggested_role,
-                "image": farmer["image"]  # Use actual image from farmer pool
-            })
-
-            # Check for flame indicator (5 consecutive performances with points)
-            recent_form = farmer_stats.get("recent_form", [])
-            farmer_with_stats["is_hot"] = (len(recent_form) == 5 and all(p > 0 for p in recent_form))
-
-            # Calculate trend indicator
-            if len(recent_form) >= 3:
-                first_half = sum(recent_form[:2]) / 2 if len(recent_form) >= 2 else 0
-                second_half = sum(recent_form[-2:]) / 2 if len(recent_form) >= 2 else 0
-
-                if second_half > first_half + 1:
-                    farmer_with_stats["trend"] = "hot_streak"
-                elif first_half > second_half + 1:
-                    farmer_with_stats["trend"] = "cold_streak"
-                elif len(recent_form) >= 4 and max(recent_form) - min(recent_form) <= 1:
-                    farmer_with_stats["trend"] = "consistent"
-                else:
-                    farmer_with_stats["trend"] = "volatile"
-            else:
-                farmer_with_stats["trend"] = "unknown"
-
-            available_farmers.append(farmer_with_stats)
-            if farmer_with_stats["avg_points"] > 0:
-                all_avg_points.append(farmer_with_stats["avg_points"])
-
-    # Calculate relative performance rating (0-100 based on ranking)
-    if all_avg_points:
-        max_avg = max(all_avg_points)
-        min_avg = min(all_avg_points)
-        avg_range = max_avg - min_avg if max_avg > min_avg else 1
-
-
-        for farmer in available_farmers:
-            if farmer["avg_points"] > 0:
-                # Relative performance based on position in the pack
-                farmer["performance_rating"] = int(((farmer["avg_points"] - min_avg) / avg_range) * 100)
-            else:
-                farmer["performance_rating"] = 0
-    else:
-        for farmer in available_farmers:
-            farmer["performance_rating"] = 0
-
-    # Sort by recent performance
-    available_farmers.sort(key=lambda x: x["avg_points"], reverse=True)
+    # The board is precomputed at market matchday and patched on swaps
+    board = load_market_board(league_code)
+    if board is None:
+        board = build_market_board(league_code, current_league["players"])
+    available_farmers = board["farmers"]
 
     # Get user's current team for swap functionality
     user_data = get_user_stats(username)
@@ -2006,6 +1893,7 @@ def market():
 
     return render_template("market.html",
         username=username,
+        league_code=league_code,
         available_farmers=available_farmers,
         current_team=current_team
     )
@@ -2024,7 +1912,6 @@ def trading():
         return redirect(url_for("index", tab="leagues"))
 
     # Get all users for trading
-    from stats import load_stats
     all_stats = load_stats()
     users = list(all_stats["users"].keys())
     users = [u for u in users if u != username]  # Remove current user
@@ -2039,6 +1926,7 @@ def trading():
 
     return render_template("trading.html",
         username=username,
+        league_code=current_league["code"],
         users=users,
         user_team=user_team,
         incoming_trades=incoming_trades,
@@ -2065,6 +1953,12 @@ def propose_trade():
     )
 
     if success:
+        current_league = get_user_league(username)
+        event_bus.publish(TRADE_PROPOSED,
+            league_code=current_league["code"] if current_league else None,
+            from_user=username,
+            to_user=target_user
+        )
         flash("Trade proposal sent!", "success")
     else:
         flash("Error sending trade proposal. Make sure both farmers are available.", "danger")
@@ -2081,13 +1975,25 @@ def respond_trade():
     action = request.form["action"]  # "accept" or "reject"
 
     if action == "accept":
-        success = trading_manager.accept_trade(trade_id, username)
+        current_league = get_user_league(username)
+        success = trading_manager.accept_trade(trade_id, username, current_league)
         if success:
+            event_bus.publish(TRADE_ACCEPTED,
+                league_code=current_league["code"] if current_league else None,
+                trade_id=trade_id,
+                accepted_by=username
+            )
             flash("Trade accepted and completed!", "success")
         else:
             flash("Error completing trade.", "danger")
     else:
         trading_manager.reject_trade(trade_id)
+        current_league = get_user_league(username)
+        event_bus.publish(TRADE_REJECTED,
+            league_code=current_league["code"] if current_league else None,
+            trade_id=trade_id,
+            rejected_by=username
+        )
         flash("Trade rejected.", "info")
 
     return redirect(url_for("trading"))
@@ -2138,13 +2044,12 @@ def view_farmer_profile(farmer_name):
     except FileNotFoundError:
         pass
 
-    # Find farmer in the farmer pool
-    farmer = None
-    for f in FARMER_POOL:
-        if f["name"] == farmer_name:
-            farmer = f.copy()
-            farmer['crop_preferences'] = crop_preferences.get(farmer_name, {})
-            break
+    # Find farmer in the farmer pool (the league's evolved pool if the viewer is in one)
+    current_league = get_user_league(session["user"])
+    farmer = get_farmer_pool(current_league["code"] if current_league else None).get(farmer_name)
+    if farmer:
+        farmer = farmer.copy()
+        farmer['crop_preferences'] = crop_preferences.get(farmer_name, {})
 
     if not farmer:
         flash("Farmer not found.", "danger")
@@ -2263,6 +2168,7 @@ def farmer_stats():
 
 
 @app.route("/get_theme")
+@conditional_api(USERS_FILE)
 def get_theme():
     if "user" not in session:
         return jsonify({"theme": "light"})
@@ -2289,6 +2195,8 @@ def finalize_draft_unlock():
     league_code = current_league["code"]
     leagues[league_code]["draft_ready"] = True
     save_leagues(leagues)
+
+    event_bus.publish(DRAFT_READY, league_code=league_code)
     
     return "OK"
 
@@ -2318,7 +2226,60 @@ def check_draft_ready():
     
     return jsonify({"ready": ready})
 
+# Seconds between keep-alive comments on idle event streams
+STREAM_HEARTBEAT_SECONDS = 15
+
+@app.route("/api/stream")
+def api_stream():
+    """Server-Sent Events stream of changes in the user's league"""
+    if "user" not in session:
+        return "Unauthorized", 401
+
+    username = session["user"]
+    league_code = request.args.get("league_code")
+
+    if league_code:
+        league = load_leagues().get(league_code)
+        if not league or username not in league.get("players", []):
+            return "Forbidden", 403
+    else:
+        current_league = get_user_league(username)
+        if not current_league:
+            return "League not found", 404
+        league_code = current_league["code"]
+
+    # Buffer events for this connection; a stalled client drops events instead of blocking publishers
+    pending = queue.Queue(maxsize=100)
+
+    def forward(event):
+        if event.get("league_code") == league_code:
+            try:
+                pending.put_nowait(event)
+            except queue.Full:
+                pass
+
+    event_bus.subscribe(ALL_EVENTS, forward)
+
+    def generate():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = pending.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            event_bus.unsubscribe(ALL_EVENTS, forward)
+
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
 @app.route("/api/current_team")
+@conditional_api(STATS_FILE)
 def api_current_team():
     if "user" not in session:
         return jsonify({}), 401
@@ -2329,16 +2290,10 @@ def api_current_team():
 
     return jsonify(current_team)
 
-@app.route("/api/user_team/<username>")
-def api_user_team(username):
-    if "user" not in session:
-        return jsonify({}), 401
-
-    user_data = get_user_stats(username)
+def format_user_team(username, user_data, user_profile):
+    """Format a user's drafted team and profile for the frontend"""
     current_team = user_data.get("drafted_team", {})
-    user_profile = get_user_profile(username)
 
-    # Format team data for easier use in frontend
     team_farmers = []
     for role, farmer in current_team.items():
         if farmer:
@@ -2348,40 +2303,95 @@ def api_user_team(username):
                 "stats": f"STR: {farmer['strength']}, HANDY: {farmer['handy']}, STA: {farmer['stamina']}, PHYS: {farmer['physical']}"
             })
 
-    return jsonify({
+    return {
         "farmers": team_farmers,
         "team_name": user_profile["team_name"],
         "profile_pic": user_profile["profile_pic"],
         "username": username
-    })
+    }
 
-@app.route("/api/matchup_points/<username>")
-def api_matchup_points(username):
+def get_cycle_farmer_points(user_data, cycle):
+    """Get total points and per-farmer points for a 3-game cycle"""
+    all_data = user_data.get("data", [])
+    cycle_start = cycle * 3
+
+    total_points = 0
+    farmer_points = {}
+    for day_data in all_data[cycle_start:cycle_start + 3]:
+        for farmer in day_data.get("farmers", []):
+            name = farmer.get("name")
+            points = farmer.get("points_after_catastrophe", 0)
+            farmer_points[name] = farmer_points.get(name, 0) + points
+            total_points += points
+
+    farmers = [{"name": name, "points": points} for name, points in farmer_points.items()]
+    farmers.sort(key=lambda x: x["points"], reverse=True)
+    return total_points, farmers
+
+def get_season_points(user_data):
+    """Get total points across all matchdays of the season"""
+    return sum(
+        farmer.get("points_after_catastrophe", 0)
+        for day_data in user_data.get("data", [])
+        for farmer in day_data.get("farmers", [])
+    )
+
+@app.route("/api/user_team/<username>")
+@conditional_api(STATS_FILE, USERS_FILE)
+def api_user_team(username):
     if "user" not in session:
-        return jsonify({"points": 0}), 401
+        return jsonify({}), 401
 
     user_data = get_user_stats(username)
     user_profile = get_user_profile(username)
-    global_matchday = get_global_matchday()
 
-    # Calculate which 3-game cycle we're currently in
-    current_cycle = global_matchday // 3
+    return jsonify(format_user_team(username, user_data, user_profile))
 
-    # Get the points for the current 3-game cycle
-    all_data = user_data.get("data", [])
+@app.route("/api/history/<username>")
+@conditional_api(STATS_FILE, "farmer_crop_preferences.json")
+def api_history(username):
+    """One page of a user's matchday history, newest first, older than ?before="""
+    if "user" not in session:
+        return jsonify({"matchdays": [], "next_before": None}), 401
 
-    # Calculate start and end indices for current cycle
-    cycle_start = current_cycle * 3
-    cycle_end = min(cycle_start + 3, len(all_data))
+    before = request.args.get("before", type=int)
+    limit = max(1, min(request.args.get("limit", HISTORY_PAGE_SIZE, type=int), 50))
 
-    total_points = 0
+    return jsonify(get_match_history_page(username, before, limit))
+
+@app.route("/history/<username>")
+def history_page(username):
+    """Full season history, streamed so the newest matchdays show while older ones render"""
+    if "user" not in session:
+        return redirect(url_for("login"))
+
+    user_data = get_user_stats(username)
+    farmer_totals = get_farmer_totals(user_data)
+    entries = reversed(user_data["data"])
+
+    # Read flashes now: the session can't be updated once the response has started
+    get_flashed_messages(with_categories=True)
+
+    return stream_template("match_history.html",
+        username=session["user"],
+        history_user=username,
+        user_profile=get_user_profile(username),
+        farmer_totals=sorted(farmer_totals.items(), key=lambda x: x[1]["points"], reverse=True),
+        fragments=iter_history_fragments(username, entries)
+    )
+
+@app.route("/api/matchup_points/<username>")
+@conditional_api(STATS_FILE, USERS_FILE, GLOBAL_MATCHDAY_FILE)
+def api_matchup_points(username):
+    if "user" not in session:
+        return jsonify({"points": 0}), 401
+
+    user_data = get_user_stats(username)
+    user_profile = get_user_profile(username)
+    global_matchday = get_global_matchday()
 
     # Sum points from the current 3-game cycle
-    for i in range(cycle_start, cycle_end):
-        if i < len(all_data):
-            day_data = all_data[i]
-            for farmer in day_data.get("farmers", []):
-                total_points += farmer.get("points_after_catastrophe", 0)
+    total_points, _ = get_cycle_farmer_points(user_data, global_matchday // 3)
 
     return jsonify({
         "points": total_points,
@@ -2390,6 +2400,7 @@ def api_matchup_points(username):
     })
 
 @app.route("/api/matchup_farmer_breakdown/<username>")
+@conditional_api(STATS_FILE, GLOBAL_MATCHDAY_FILE)
 def api_matchup_farmer_breakdown(username):
     if "user" not in session:
         return jsonify({"farmers": []}), 401
@@ -2397,53 +2408,65 @@ def api_matchup_farmer_breakdown(username):
     user_data = get_user_stats(username)
     global_matchday = get_global_matchday()
 
-    # Calculate which 3-game cycle we're currently in
-    current_cycle = global_matchday // 3
-
-    # Get the data for the current 3-game cycle
-    all_data = user_data.get("data", [])
-
-    # Calculate start and end indices for current cycle
-    cycle_start = current_cycle * 3
-    cycle_end = min(cycle_start + 3, len(all_data))
-
-    farmer_points = {}
-
-    # Sum points by farmer from the current 3-game cycle
-    for i in range(cycle_start, cycle_end):
-        if i < len(all_data):
-            day_data = all_data[i]
-            for farmer in day_data.get("farmers", []):
-                name = farmer.get("name")
-                points = farmer.get("points_after_catastrophe", 0)
-                farmer_points[name] = farmer_points.get(name, 0) + points
-
-    # Convert to list format for easier frontend handling
-    farmers = [{"name": name, "points": points} for name, points in farmer_points.items()]
-
-    # Sort by points descending
-    farmers.sort(key=lambda x: x["points"], reverse=True)
+    # Points by farmer from the current 3-game cycle, highest first
+    _, farmers = get_cycle_farmer_points(user_data, global_matchday // 3)
 
     return jsonify({"farmers": farmers})
 
 @app.route("/api/total_season_points/<username>")
+@conditional_api(STATS_FILE)
 def api_total_season_points(username):
     if "user" not in session:
         return jsonify({"total_points": 0}), 401
 
     user_data = get_user_stats(username)
 
-    # Calculate total points across all matchdays
-    total_points = 0
-    all_data = user_data.get("data", [])
+    return jsonify({"total_points": get_season_points(user_data)})
 
-    for day_data in all_data:
-        for farmer in day_data.get("farmers", []):
-            total_points += farmer.get("points_after_catastrophe", 0)
+@app.route("/api/dashboard")
+@conditional_api(STATS_FILE, USERS_FILE, LEAGUES_FILE, GLOBAL_MATCHDAY_FILE)
+def api_dashboard():
+    """Matchup widget data for the user and their current opponent from one data snapshot"""
+    if "user" not in session:
+        return jsonify({}), 401
+
+    username = session["user"]
+
+    # Read every store once and compute both sides from the same snapshot
+    all_stats = load_stats()
+    users = load_users()
+    global_matchday = get_global_matchday()
+    current_league = get_user_league(username)
+
+    opponent = None
+    if current_league and current_league.get("use_playoffs", True) and current_league.get("draft_complete"):
+        opponent = get_current_matchup(username, current_league)
+
+    cycle = global_matchday // 3
+
+    def build_side(side_username):
+        user_data = all_stats["users"].get(side_username, {"matchday": 0, "drafted_team": {}, "data": []})
+        user_profile = build_user_profile(side_username, users.get(side_username, {}))
+        matchup_points, farmer_points = get_cycle_farmer_points(user_data, cycle)
 
-    return jsonify({"total_points": total_points})
+        side = format_user_team(side_username, user_data, user_profile)
+        side.update({
+            "matchup_points": matchup_points,
+            "farmer_points": farmer_points,
+            "total_points": get_season_points(user_data)
+        })
+        return side
+
+    return jsonify({
+        "global_matchday": global_matchday,
+        "cycle": cycle,
+        "cycle_day": (global_matchday % 3) + 1,
+        "user": build_side(username),
+        "opponent": build_side(opponent) if opponent else None
+    })
 
 @app.route("/api/team_stats_comparison")
+@conditional_api(STATS_FILE, LEAGUES_FILE, GLOBAL_MATCHDAY_FILE)
 def api_team_stats_comparison():
     if "user" not in session:
         return jsonify({}), 401
@@ -2492,6 +2515,7 @@ def api_team_stats_comparison():
     })
 
 @app.route("/api/matchup_cycle_progress")
+@conditional_api(LEAGUES_FILE, GLOBAL_MATCHDAY_FILE)
 def api_matchup_cycle_progress():
     if "user" not in session:
         return jsonify({}), 401
@@ -2513,6 +2537,7 @@ def api_matchup_cycle_progress():
     })
 
 @app.route("/api/previous_matchup_results/<username>/<int:cycle>")
+@conditional_api(STATS_FILE, USERS_FILE, LEAGUES_FILE)
 def api_previous_matchup_results(username, cycle):
     if "user" not in session:
         return jsonify({}), 401
@@ -2522,38 +2547,7 @@ def api_previous_matchup_results(username, cycle):
         return jsonify({})
 
     # Get the opponent for the specified cycle
-    opponent = None
-    matchdays_limit = current_league.get("matchdays", 30)
-    bracket_creation_point = matchdays_limit // 2
-
-    # Calculate the global matchday for the start of this cycle
-    cycle_start_matchday = cycle * 3
-
-    if cycle_start_matchday < bracket_creation_point:
-        # Use regular matchup schedule before brackets
-        if "matchup_schedule" in current_league and username in current_league["matchup_schedule"]:
-            schedule = current_league["matchup_schedule"][username]
-            if cycle < len(schedule):
-                opponent = schedule[cycle]
-    else:
-        # Use bracket schedules after bracket creation
-        brackets = current_league.get("playoff_brackets", {})
-        bracket_schedules = current_league.get("bracket_schedules", {})
-
-        # Find which bracket the player is in
-        player_bracket = None
-        if username in brackets.get("winners", []):
-            player_bracket = "winners"
-        elif username in brackets.get("losers", []):
-            player_bracket = "losers"
-
-        if player_bracket and player_bracket in bracket_schedules:
-            bracket_schedule = bracket_schedules[player_bracket]
-            if username in bracket_schedule:
-                # Adjust cycle index for bracket phase
-                bracket_cycle = cycle - (bracket_creation_point // 3)
-                if bracket_cycle >= 0 and bracket_cycle < len(bracket_schedule[username]):
-                    opponent = bracket_schedule[username][bracket_cycle]
+    opponent = get_scheduled_opponent(current_league, username, cycle)
 
     if not opponent:
         return jsonify({"opponent": None})
@@ -2616,6 +2610,23 @@ def api_previous_matchup_results(username, cycle):
         "opponentChant": opponent_profile["team_chant"]
     })
 
+@app.route("/api/season_rollover/<league_code>")
+def api_season_rollover(league_code):
+    if "user" not in session:
+        return jsonify({}), 401
+
+    status = season_rollover.load_rollover_status(league_code)
+    if status is None:
+        return jsonify({"league_code": league_code, "status": "idle"})
+
+    status["stages"] = [stage for stage, _, _ in season_rollover.ROLLOVER_STAGES]
+    status["queued"] = scheduler.get_job(get_rollover_job_id(league_code)) is not None
+    if status["status"] in ("queued", "running") and not is_rollover_active(league_code):
+        # Left behind by a restart or crash; Play Again resumes it
+        status["status"] = "interrupted"
+        status["error"] = "The season rollover was interrupted"
+    return jsonify(status)
+
 @app.route("/swap_farmer", methods=["POST"])
 def swap_farmer():
     if "user" not in session:
@@ -2625,7 +2636,10 @@ def swap_farmer():
 
     # Check if user is in a league and if playoffs have started (and market lock is enabled)
     current_league = get_user_league(username)
-    if current_league and current_league.get("brackets_created", False) and current_league.get("lock_market_in_playoffs", True):
+    if not current_league:
+        flash("You must be in an active league to access the Farmers Market.", "warning")
+        return redirect(url_for("index", tab="leagues"))
+    if current_league.get("brackets_created", False) and current_league.get("lock_market_in_playoffs", True):
         flash("The Farmers Market is locked during playoff season. No swaps are allowed.", "warning")
         return redirect(url_for("index", tab="leagues"))
 
@@ -2636,61 +2650,72 @@ def swap_farmer():
         flash("Invalid swap request. Please try again.", "danger")
         return redirect(url_for("market"))
 
-    # Get user's current team
-    user_data = get_user_stats(username)
-    current_team = user_data.get("drafted_team", {})
-
     # Valid roles for any user team
     valid_roles = ["Fix Meiser", "Speed Runner", "Lift Tender", "Bench 1", "Bench 2"]
     if current_farmer_role not in valid_roles:
         flash("Invalid role selected.", "danger")
         return redirect(url_for("market"))
 
-    # Get league-specific farmer pool
-    current_league = get_user_league(username)
-    league_farmer_pool = load_farmer_pool(current_league["code"] if current_league else None)
-
-    # Get the market farmer data from the farmer pool
-    market_farmer = next((f for f in league_farmer_pool if f["name"] == market_farmer_name), None)
+    # Get the market farmer data from the league-specific farmer pool
+    market_farmer = get_farmer_pool(current_league["code"]).get(market_farmer_name)
     if not market_farmer:
         flash("Market farmer not found.", "danger")
         return redirect(url_for("market"))
 
-    # Check if market farmer is actually available (not drafted)
-    from stats import load_stats
-    all_stats = load_stats()
-
-    drafted_farmers = set()
-    for user_stats in all_stats["users"].values():
-        for farmer_data in user_stats.get("drafted_team", {}).values():
-            if isinstance(farmer_data, dict):
-                drafted_farmers.add(farmer_data["name"])
+    # The availability check and every write happen under one lock, so two
+    # users can't both acquire the same farmer
+    with store_lock():
+        ownership = load_ownership_index(current_league["code"], current_league["players"])
+
+        # Check if market farmer is actually available (not on a team in this league)
+        if market_farmer_name in ownership["farmers"]:
+            flash("This farmer is no longer available.", "danger")
+            return redirect(url_for("market"))
+
+        # Get user's current team
+        all_stats = load_stats()
+        user_data = all_stats["users"].get(username, {"matchday": 0, "drafted_team": {}, "data": []})
+        current_team = user_data.get("drafted_team", {})
+
+        # Perform the swap
+        old_farmer = current_team.get(current_farmer_role)
+
+        # Replace/assign the farmer in the user's team
+        current_team[current_farmer_role] = {
+            "name": market_farmer["name"],
+            "strength": market_farmer["strength"],
+            "handy": market_farmer["handy"],
+            "stamina": market_farmer["stamina"],
+            "physical": market_farmer["physical"]
+        }
 
-    if market_farmer_name in drafted_farmers:
-        flash("This farmer is no longer available.", "danger")
-        return redirect(url_for("market"))
+        # Update user stats and ownership together
+        user_data["drafted_team"] = current_team
+        all_stats["users"][username] = user_data
+        writes = {
+            STATS_FILE: all_stats,
+            get_ownership_file(current_league["code"]): apply_team_ownership(ownership, {username: current_team})
+        }
 
-    # Perform the swap
-    old_farmer = current_team.get(current_farmer_role)
+        # Clear any market stats for the acquired farmer (they're no longer in this league's market)
+        market_manager = MarketManager(current_league["code"])
+        market_stats = market_manager.load_market_stats()
+        if market_farmer_name in market_stats:
+            del market_stats[market_farmer_name]
+            writes[market_manager.stats_file] = market_stats
 
-    # Replace/assign the farmer in the user's team
-    current_team[current_farmer_role] = {
-        "name": market_farmer["name"],
-        "strength": market_farmer["strength"],
-        "handy": market_farmer["handy"],
-        "stamina": market_farmer["stamina"],
-        "physical": market_farmer["physical"]
-    }
+        commit(writes)
 
-    # Update user stats
-    user_data["drafted_team"] = current_team
-    update_user_stats(username, user_data)
+    update_market_board_after_swap(current_league["code"], market_farmer["name"],
+        old_farmer.get("name") if old_farmer else None)
 
-    # Clear any market stats for the acquired farmer (they're no longer in market)
-    market_stats = market_manager.get_market_stats()
-    if market_farmer_name in market_stats:
-        del market_stats[market_farmer_name]
-        market_manager.save_market_stats(market_stats)
+    event_bus.publish(FARMER_SWAPPED,
+        league_code=current_league["code"],
+        username=username,
+        role=current_farmer_role,
+        acquired=market_farmer["name"],
+        released=old_farmer.get("name") if old_farmer else None
+    )
 
     if old_farmer and old_farmer.get('name'):
         flash(f"Successfully swapped {old_farmer['name']} for {market_farmer['name']} in the {current_farmer_role} role!", "success")
@@ -2713,15 +2738,14 @@ def league_chat():
     # Get chat messages
     messages = chat_manager.get_recent_messages(current_league["code"])
 
-    # Get user profiles for message display
-    user_profiles = {}
-    for player in current_league["players"]:
-        user_profiles[player] = get_user_profile(player)
+    # Get user profiles for members and message authors (who may have left the league)
+    user_profiles = get_user_profiles(current_league["players"] + [m["username"] for m in messages])
 
     return render_template("league_chat.html",
         username=username,
         current_league=current_league,
         messages=messages,
+        last_message_id=messages[-1]["id"] if messages else 0,
         user_profiles=user_profiles
     )
 
@@ -2758,6 +2782,7 @@ def send_chat_message():
     })
 
 @app.route("/api/chat_messages/<league_code>")
+@conditional_api(USERS_FILE, LEAGUES_FILE, lambda kwargs: chat_manager.get_chat_file(kwargs["league_code"]))
 def api_chat_messages(league_code):
     if "user" not in session:
         return jsonify([]), 401
@@ -2768,13 +2793,17 @@ def api_chat_messages(league_code):
     if not current_league or current_league["code"] != league_code:
         return jsonify([]), 403
 
-    messages = chat_manager.get_recent_messages(league_code)
+    # Clients pass the last id they have so only new messages are sent, and
+    # keep asking while has_more is set
+    since_id = request.args.get("since_id", 0, type=int)
+    messages, has_more = chat_manager.get_messages_since(league_code, since_id)
 
-    # Add user profiles to messages
+    # Resolve each author's profile once for the whole response
+    user_profiles = get_user_profiles(m["username"] for m in messages)
     for message in messages:
-        message["user_profile"] = get_user_profile(message["username"])
+        message["user_profile"] = user_profiles[message["username"]]
 
-    return jsonify(messages)
+    return jsonify({"messages": messages, "has_more": has_more})
 
 @app.route("/almanac")
 def almanac():
@@ -0,0 +1,61 @@
+"""Benchmark the batched season-fill simulator against the per-game one.
+
+Run from the project directory: python bench_season_fill.py [seasons]
+
+Simulates a full season for every farmer in farmer_pool.json with both
+simulate_farmer_performance (one call per farmer) and simulate_season_fill
+(one batch), and prints the time taken and the mean/stdev of points and
+injuries per farmer-season so the two can be compared.
+"""
+import json
+import random
+import statistics
+import sys
+import time
+import importlib
+
+season_tools = importlib.import_module("continue")
+
+SEASON_LENGTH = 30
+
+def summarize(label, elapsed, results):
+    points = [result["points"] for result in results]
+    injuries = [result["injuries"] for result in results]
+    print(f"{label:<10} {elapsed:8.3f}s  "
+          f"points {statistics.mean(points):8.2f} ± {statistics.stdev(points):6.2f}  "
+          f"injuries {statistics.mean(injuries):5.2f} ± {statistics.stdev(injuries):5.2f}")
+
+def main():
+    seasons = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    with open("farmer_pool.json", "r") as f:
+        farmer_pool = json.load(f)
+    jobs = [(farmer, SEASON_LENGTH) for farmer in farmer_pool] * seasons
+
+    print(f"{len(farmer_pool)} farmers x {seasons} seasons of {SEASON_LENGTH} games")
+
+    random.seed(1)
+    start = time.perf_counter()
+    per_game = [season_tools.simulate_farmer_performance(farmer, num_games) for farmer, num_games in jobs]
+    per_game_time = time.perf_counter() - start
+    summarize("per-game", per_game_time, per_game)
+
+    random.seed(1)
+    start = time.perf_counter()
+    batched = season_tools.simulate_season_fill(jobs)
+    batched_time = time.perf_counter() - start
+    summarize("batched", batched_time, batched)
+
+    print(f"speedup    {per_game_time / batched_time:8.1f}x")
+
+    # Per-farmer means should agree within sampling noise
+    worst = 0
+    for index, farmer in enumerate(farmer_pool):
+        old = [result["points"] for result in per_game[index::len(farmer_pool)]]
+        new = [result["points"] for result in batched[index::len(farmer_pool)]]
+        spread = statistics.stdev(old + new) or 1
+        worst = max(worst, abs(statistics.mean(old) - statistics.mean(new)) / (spread / seasons ** 0.5))
+    print(f"largest per-farmer mean difference: {worst:.2f} standard errors")
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,141 @@
 
 import os
 import json
+import fcntl
+from collections import deque
 from datetime import datetime
+from events import event_bus, CHAT_MESSAGE
+
+# Bytes read per step when scanning a chat log backwards
+CHAT_READ_BLOCK_SIZE = 8192
 
 class ChatManager:
+    """League chat stored as an append-only JSON Lines log per league.
+
+    Message ids are monotonic within a league, so clients can sync
+    incrementally by asking only for messages after the last id they saw.
+    """
+
     def __init__(self):
         self.chats_dir = "league_chats"
         os.makedirs(self.chats_dir, exist_ok=True)
-    
+
     def get_chat_file(self, league_code):
-        """Get the chat file path for a league"""
+        """Get the chat log path for a league"""
+        return os.path.join(self.chats_dir, f"chat_{league_code}.jsonl")
+
+    def get_legacy_chat_file(self, league_code):
+        """Get the pre-log whole-file chat path for a league"""
         return os.path.join(self.chats_dir, f"chat_{league_code}.json")
-    
-    def load_chat_messages(self, league_code):
-        """Load chat messages for a league"""
+
+    def _migrate_legacy_chat(self, league_code):
+        """Convert an old chat_<code>.json file into the append-only log"""
+        legacy_file = self.get_legacy_chat_file(league_code)
+        if not os.path.exists(legacy_file):
+            return
+
         chat_file = self.get_chat_file(league_code)
+        with open(chat_file, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            # Another worker may have finished the migration while we waited
+            if not os.path.exists(legacy_file):
+                return
+            with open(legacy_file, "r") as legacy:
+                messages = json.load(legacy)
+            if f.tell() == 0:
+                for message in messages:
+                    f.write(json.dumps(message) + "\n")
+            os.remove(legacy_file)
+
+    def _read_messages_reversed(self, league_code):
+        """Yield a league's messages newest first, reading the log from the end"""
         try:
-            with open(chat_file, "r") as f:
-                return json.load(f)
+            f = open(self.get_chat_file(league_code), "rb")
         except FileNotFoundError:
-            return []
-    
-    def save_chat_messages(self, league_code, messages):
-        """Save chat messages for a league"""
-        chat_file = self.get_chat_file(league_code)
-        with open(chat_file, "w") as f:
-            json.dump(messages, f, indent=4)
-    
+            return
+
+        with f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            remainder = b""
+            while position > 0:
+                step = min(CHAT_READ_BLOCK_SIZE, position)
+                position -= step
+                f.seek(position)
+                lines = (f.read(step) + remainder).split(b"\n")
+                # The first piece may be a partial line; finish it on the next block
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    if line.strip():
+                        yield json.loads(line)
+            if remainder.strip():
+                yield json.loads(remainder)
+
+    def load_chat_messages(self, league_code):
+        """Load all chat messages for a league, oldest first"""
+        self._migrate_legacy_chat(league_code)
+        messages = list(self._read_messages_reversed(league_code))
+        messages.reverse()
+        return messages
+
+    def _read_last_id(self, league_code):
+        """Get the id of the newest message in the log (0 if none)"""
+        newest = next(self._read_messages_reversed(league_code), None)
+        return newest["id"] if newest else 0
+
+    def get_last_message_id(self, league_code):
+        """Get the id of the newest message in a league (0 if none)"""
+        self._migrate_legacy_chat(league_code)
+        return self._read_last_id(league_code)
+
     def add_message(self, league_code, username, message):
-        """Add a new message to the league chat"""
-        messages = self.load_chat_messages(league_code)
-        
-        new_message = {
-            "id": len(messages) + 1,
-            "username": username,
-            "message": message,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        messages.append(new_message)
-        self.save_chat_messages(league_code, messages)
+        """Append a new message to the league chat log"""
+        self._migrate_legacy_chat(league_code)
+        chat_file = self.get_chat_file(league_code)
+
+        with open(chat_file, "a") as f:
+            # Hold the lock across reading the last id and appending so ids stay unique
+            fcntl.flock(f, fcntl.LOCK_EX)
+            new_message = {
+                "id": self._read_last_id(league_code) + 1,
+                "username": username,
+                "message": message,
+                "timestamp": datetime.now().isoformat()
+            }
+            f.write(json.dumps(new_message) + "\n")
+
+        event_bus.publish(CHAT_MESSAGE, league_code=league_code, message=new_message)
         return new_message
-    
+
     def delete_league_chat(self, league_code):
         """Delete all chat messages for a league"""
-        chat_file = self.get_chat_file(league_code)
-        if os.path.exists(chat_file):
-            os.remove(chat_file)
-    
+        for chat_file in (self.get_chat_file(league_code), self.get_legacy_chat_file(league_code)):
+            if os.path.exists(chat_file):
+                os.remove(chat_file)
+
     def get_recent_messages(self, league_code, limit=50):
-        """Get recent messages for a league"""
-        messages = self.load_chat_messages(league_code)
-        return messages[-limit:] if len(messages) > limit else messages
+        """Get the newest `limit` messages for a league, oldest first"""
+        self._migrate_legacy_chat(league_code)
+        messages = []
+        for message in self._read_messages_reversed(league_code):
+            if len(messages) >= limit:
+                break
+            messages.append(message)
+        messages.reverse()
+        return messages
+
+    def get_messages_since(self, league_code, since_id, limit=50):
+        """Get the oldest `limit` messages after since_id, oldest first, and whether more follow.
+
+        Returning the oldest ones lets a client that fell behind page
+        forward from its cursor without skipping a gap.
+        """
+        self._migrate_legacy_chat(league_code)
+        # The log is read newest first, so the oldest limit + 1 are the last ones seen
+        oldest = deque(maxlen=limit + 1)
+        for message in self._read_messages_reversed(league_code):
+            if message["id"] <= since_id:
+                break
+            oldest.append(message)
+        messages = list(reversed(oldest))
+        return messages[:limit], len(messages) > limit
@@ -1,9 +1,30 @@
 
 import json
 import os
+import fcntl
 import random
-from stats import load_stats, get_user_stats
+from contextlib import contextmanager
+from datetime import datetime
+from stats import STATS_FILE, load_stats
+from store import atomic_write_json, load_leagues, store_lock, commit, LEAGUES_FILE
 from market import get_undrafted_farmers
+from leaderboards import refresh_leaderboards
+from season_history import record_season
+from pools import get_farmer_pool, get_league_pool_file, invalidate_pool
+from draft import remove_draft_state
+
+def aggregate_season_performance(all_stats, league_players):
+    """One pass over the league's matchday logs: per-farmer games, points and injuries"""
+    season_totals = {}
+    for player in league_players:
+        for entry in all_stats["users"].get(player, {}).get("data", []):
+            for farmer_match in entry.get("farmers", []):
+                totals = season_totals.setdefault(
+                    farmer_match.get("name"), {"games_played": 0, "total_points": 0, "total_injuries": 0})
+                totals["games_played"] += 1
+                totals["total_points"] += farmer_match.get("points_after_catastrophe", 0)
+                totals["total_injuries"] += farmer_match.get("injuries_this_season", 0)
+    return season_totals
 
 def archive_season_performance(league_code):
     """Archive all farmers' performance data from the completed season"""
@@ -27,12 +48,16 @@ def archive_season_performance(league_code):
     # Track all farmers that were drafted in this league
     drafted_farmers = set()
     for player in league_players:
-        user_data = get_user_stats(player)
+        user_data = all_stats["users"].get(player, {})
         for farmer_data in user_data.get("drafted_team", {}).values():
             if isinstance(farmer_data, dict):
                 drafted_farmers.add(farmer_data["name"])
     
-    # Process each farmer in the pool
+    season_totals = aggregate_season_performance(all_stats, league_players)
+    
+    # (farmer, performance_data, games to simulate) for everyone short of a full season
+    to_simulate = []
+    
     for farmer in farmer_pool:
         farmer_name = farmer["name"]
         performance_data = {
@@ -51,52 +76,37 @@ def archive_season_performance(league_code):
             "simulated_games": 0
         }
         
-        # Collect actual performance data if farmer was drafted
+        # Actual performance only counts for farmers drafted in this league
         if farmer_name in drafted_farmers:
-            for player in league_players:
-                user_data = get_user_stats(player)
-                for entry in user_data.get("data", []):
-                    for farmer_match in entry.get("farmers", []):
-                        if farmer_match.get("name") == farmer_name:
-                            performance_data["games_played"] += 1
-                            performance_data["total_points"] += farmer_match.get("points_after_catastrophe", 0)
-                            performance_data["total_injuries"] += farmer_match.get("injuries_this_season", 0)
-        
-        # Simulate missing games if farmer was drafted but didn't play full season
-        if performance_data["was_drafted"] and performance_data["games_played"] < season_length:
-            missing_games = season_length - performance_data["games_played"]
-            simulated_performance = simulate_farmer_performance(farmer, missing_games)
-            performance_data["total_points"] += simulated_performance["points"]
-            performance_data["total_injuries"] += simulated_performance["injuries"]
-            performance_data["simulated_games"] = missing_games
-        
-        # Simulate entire season if farmer was never drafted
-        elif not performance_data["was_drafted"]:
-            simulated_performance = simulate_farmer_performance(farmer, season_length)
-            performance_data["total_points"] = simulated_performance["points"]
-            performance_data["total_injuries"] = simulated_performance["injuries"]
+            performance_data.update(season_totals.get(farmer_name, {}))
+            if performance_data["games_played"] < season_length:
+                to_simulate.append((farmer, performance_data, season_length - performance_data["games_played"]))
+        else:
+            # Never drafted: the entire season is simulated
             performance_data["games_played"] = season_length
-            performance_data["simulated_games"] = season_length
+            to_simulate.append((farmer, performance_data, season_length))
         
         archived_performance[farmer_name] = performance_data
     
+    # Simulate missing games for the whole pool in one batch
+    simulated = simulate_season_fill([(farmer, missing_games) for farmer, _, missing_games in to_simulate])
+    for (farmer, performance_data, missing_games), simulated_performance in zip(to_simulate, simulated):
+        performance_data["total_points"] += simulated_performance["points"]
+        performance_data["total_injuries"] += simulated_performance["injuries"]
+        performance_data["simulated_games"] = missing_games
+    
+    # Keep every season, not just the last, for draft room trends. Recorded
+    # first so an older history can still be seeded from the previous archive
+    record_season(league_code, archived_performance, league.get("completion_date"))
+    
     # Save archived performance
     with open(archive_file, "w") as f:
         json.dump(archived_performance, f, indent=4)
     
     return True
 
-def simulate_farmer_performance(farmer, num_games):
-    """Simulate farmer performance for missing games using exact core.py logic"""
-    from tasks import get_task_for_job
-    
-    best_role = determine_best_role(farmer)
-    total_points = 0
-    total_injuries = 0
-    injury_points_lost = 0
-    miss_days = 0
-    
-    # Load seasonal crops and farmer preferences
+def load_simulation_data():
+    """Seasonal crop lists and farmer crop preferences used by the season simulators"""
     try:
         with open("seasonal_crops.json", "r") as f:
             seasonal_crops = json.load(f)
@@ -114,6 +124,21 @@ def simulate_farmer_performance(farmer, num_games):
     except FileNotFoundError:
         farmer_preferences = {}
     
+    return seasonal_crops, farmer_preferences
+
+def simulate_farmer_performance(farmer, num_games):
+    """Simulate farmer performance for missing games using exact core.py logic"""
+    from tasks import get_task_for_job
+    
+    best_role = determine_best_role(farmer)
+    total_points = 0
+    total_injuries = 0
+    injury_points_lost = 0
+    miss_days = 0
+    
+    # Load seasonal crops and farmer preferences
+    seasonal_crops, farmer_preferences = load_simulation_data()
+    
     # Get season (default to summer for simulation)
     season = "summer"
     
@@ -211,6 +236,84 @@ def simulate_farmer_performance(farmer, num_games):
     
     return {"points": total_points, "injuries": total_injuries}
 
+# Catastrophe outcomes of core.py's 1-100 roll as (event_type, point loss, cumulative weight):
+# under 60 is a type 1 that hits a given farmer a third of the time, 80-89 type 2, 90+ type 3
+CATASTROPHE_OUTCOMES = [(1, 1), (1, 0), (0, 0), (2, 2), (3, 0)]
+CATASTROPHE_CUM_WEIGHTS = [0.59 * 0.33, 0.59, 0.79, 0.89, 1.0]
+
+def simulate_season_fill(jobs, season="summer"):
+    """Simulate missing games for many farmers at once.
+
+    `jobs` is a list of (farmer, num_games); returns a matching list of
+    {"points", "injuries"}. Statistically the same as calling
+    simulate_farmer_performance for each job, but the crop files are read
+    once, task points come from an exact per-stat-line distribution
+    instead of get_task_for_job, and each farmer's dice are drawn for the
+    whole season up front. Only the injury carry-over walks game by game.
+    """
+    from tasks import get_task_points_distribution
+    
+    seasonal_crops, farmer_preferences = load_simulation_data()
+    daily_crops = seasonal_crops.get(season, ["corn"])
+    
+    results = []
+    for farmer, num_games in jobs:
+        if num_games <= 0:
+            results.append({"points": 0, "injuries": 0})
+            continue
+        
+        points_values, points_cum_weights = get_task_points_distribution(
+            determine_best_role(farmer), farmer["strength"], farmer["handy"], farmer["stamina"])
+        
+        # Injury: 1 in 3, then a d11 over physical; half of injuries also miss 1-2 days
+        injury_chance = max(0, min(11, 11 - farmer["physical"])) / 11 / 3
+        preferred_crop = farmer_preferences.get(farmer["name"], {}).get(season, "")
+        preferred_chance = daily_crops.count(preferred_crop) / len(daily_crops)
+        
+        task_points = random.choices(points_values, cum_weights=points_cum_weights, k=num_games)
+        events = random.choices(CATASTROPHE_OUTCOMES, cum_weights=CATASTROPHE_CUM_WEIGHTS, k=num_games)
+        injury_losses = random.choices([0, 1, 2], weights=[1 - injury_chance, injury_chance / 2, injury_chance / 2], k=num_games)
+        missed = random.choices([0, 1, 2], weights=[2, 1, 1], k=num_games)
+        success_crops = random.choices(range(30, 51), k=num_games)
+        failure_crops = random.choices(range(5, 21), k=num_games)
+        preferred = random.choices([True, False], weights=[preferred_chance, 1 - preferred_chance], k=num_games)
+        
+        total_points = 0
+        total_injuries = 0
+        miss_days = 0
+        for game in range(num_games):
+            # Skip if farmer is injured
+            if miss_days > 0:
+                miss_days -= 1
+                continue
+            
+            pts = task_points[game]
+            event_type, cat_ptloss = events[game]
+            injury_loss = injury_losses[game]
+            if injury_loss:
+                total_injuries += 1
+                miss_days = missed[game]
+            
+            base_crops = success_crops[game] if pts > 0 else failure_crops[game]
+            if preferred[game]:
+                base_crops = int(base_crops * 1.5)
+            
+            if event_type >= 2:
+                final_crops = 0
+            elif injury_loss or event_type == 1:
+                final_crops = int(base_crops * 0.4)
+            else:
+                final_crops = base_crops
+            
+            if event_type == 3:
+                pts = 0
+            final_points = max(0, pts - cat_ptloss - injury_loss)
+            total_points += final_points + final_crops
+        
+        results.append({"points": total_points, "injuries": total_injuries})
+    
+    return results
+
 def determine_best_role(farmer):
     """Determine farmer's best role based on highest non-physical stat"""
     stats = {
@@ -306,9 +409,8 @@ def calculate_stat_progression(league_code):
     new_farmer_pool = apply_random_stat_boosts(new_farmer_pool, league_code)
     
     # Save league-specific farmer pool
-    league_farmer_pool_file = f"farmer_pool_{league_code}.json"
-    with open(league_farmer_pool_file, "w") as f:
-        json.dump(new_farmer_pool, f, indent=4)
+    atomic_write_json(get_league_pool_file(league_code), new_farmer_pool)
+    invalidate_pool(league_code)
     
     return True
 
@@ -381,71 +483,74 @@ def apply_random_stat_boosts(farmer_pool, league_code):
 
 def reset_league_for_new_season(league_code):
     """Reset league data while preserving core settings and using new farmer pool"""
-    leagues = load_leagues()
-    
-    if league_code not in leagues:
-        return False
-    
-    league = leagues[league_code]
-    
-    # Preserve core league settings
-    core_settings = {
-        "name": league["name"],
-        "code": league["code"],
-        "host": league["host"],
-        "players": league["players"],
-        "season": league["season"],
-        "matchdays": league["matchdays"],
-        "use_playoffs": league["use_playoffs"],
-        "playoff_cutoff": league["playoff_cutoff"],
-        "lock_market_in_playoffs": league["lock_market_in_playoffs"]
-    }
-    
-    # Reset league to pre-draft state
-    leagues[league_code] = {
-        **core_settings,
-        "draft_time": None,
-        "draft_complete": False,
-        "snake_order": [],
-        "market_initialized": False,
-        "playoff_records": {},
-        "recorded_matchups": [],
-        "status": "active",  # Remove finished status
-        "picks_made": 0,
-        "picked_farmers": [],
-        "user_drafts": {},
-        "matchup_schedule": {},
-        "brackets_created": False,
-        "playoff_brackets": {},
-        "bracket_schedules": {}
-    }
-    
-    # Clear final standings and archived teams
-    if "final_standings" in leagues[league_code]:
-        del leagues[league_code]["final_standings"]
-    if "winner" in leagues[league_code]:
-        del leagues[league_code]["winner"]
-    if "completion_date" in leagues[league_code]:
-        del leagues[league_code]["completion_date"]
-    if "archived_teams" in leagues[league_code]:
-        del leagues[league_code]["archived_teams"]
-    
-    save_leagues(leagues)
-    
-    # Reset all players' stats
-    from stats import load_stats, save_stats
-    all_stats = load_stats()
+    # Matchdays, trades and league finishing write these files under the store lock too
+    with store_lock():
+        leagues = load_leagues()
     
-    for player in league["players"]:
-        if player in all_stats["users"]:
-            all_stats["users"][player] = {
-                "matchday": 0,
-                "drafted_team": {},
-                "data": []
-            }
+        if league_code not in leagues:
+            return False
+    
+        league = leagues[league_code]
+    
+        # Preserve core league settings
+        core_settings = {
+            "name": league["name"],
+            "code": league["code"],
+            "host": league["host"],
+            "players": league["players"],
+            "season": league["season"],
+            "matchdays": league["matchdays"],
+            "use_playoffs": league["use_playoffs"],
+            "playoff_cutoff": league["playoff_cutoff"],
+            "lock_market_in_playoffs": league["lock_market_in_playoffs"]
+        }
     
-    save_stats(all_stats)
+        # Reset league to pre-draft state
+        leagues[league_code] = {
+            **core_settings,
+            "draft_time": None,
+            "draft_complete": False,
+            "snake_order": [],
+            "market_initialized": False,
+            "playoff_records": {},
+            "playoff_ledger": {},
+            "status": "active",  # Remove finished status
+            "matchup_schedule": {},
+            "matchup_table": {},
+            "matchup_fingerprint": None,
+            "brackets_created": False,
+            "playoff_brackets": {},
+            "bracket_schedules": {}
+        }
     
+        # Clear final standings and archived teams
+        if "final_standings" in leagues[league_code]:
+            del leagues[league_code]["final_standings"]
+        if "winner" in leagues[league_code]:
+            del leagues[league_code]["winner"]
+        if "completion_date" in leagues[league_code]:
+            del leagues[league_code]["completion_date"]
+        if "archived_teams" in leagues[league_code]:
+            del leagues[league_code]["archived_teams"]
+    
+        # Reset all players' stats
+        all_stats = load_stats()
+    
+        for player in league["players"]:
+            if player in all_stats["users"]:
+                all_stats["users"][player] = {
+                    "matchday": 0,
+                    "drafted_team": {},
+                    "data": []
+                }
+    
+        # The league and its players' stats are reset in one commit
+        commit({LEAGUES_FILE: leagues, STATS_FILE: all_stats})
+        refresh_leaderboards([league_code])
+
+    # The next draft starts from a fresh draft state
+    remove_draft_state(league_code)
+
     # Clean up league-specific files
     cleanup_league_files(league_code)
     
@@ -455,6 +560,10 @@ def cleanup_league_files(league_code):
     """Clean up league-specific files for fresh start"""
     files_to_clean = [
         f"market_{league_code}.json",
+        f"market_board_{league_code}.json",
+        f"market_stats_{league_code}.json",
+        f"market_assignments_{league_code}.json",
+        f"ownership_{league_code}.json",
         f"chat_{league_code}.json"
     ]
     
@@ -479,50 +588,118 @@ def cleanup_league_files(league_code):
     except FileNotFoundError:
         pass
 
-def load_leagues():
-    """Load leagues data"""
-    try:
-        with open("leagues.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+def load_farmer_pool():
+    """Load the original farmer pool that every league's progression starts from"""
+    return get_farmer_pool().farmers
 
-def save_leagues(leagues):
-    """Save leagues data"""
-    with open("leagues.json", "w") as f:
-        json.dump(leagues, f, indent=4)
+# Rollover stages in order; each one is checkpointed once it succeeds
+ROLLOVER_STAGES = [
+    ("archive", archive_season_performance, "Previous season performance archived successfully"),
+    ("progression", calculate_stat_progression, "Farmer stat progression calculated and applied"),
+    ("reset", reset_league_for_new_season, "League reset for the new season")
+]
 
-def load_farmer_pool():
-    """Load farmer pool data"""
+def get_rollover_file(league_code):
+    return f"season_rollover_{league_code}.json"
+
+def get_rollover_lock_file(league_code):
+    return f".season_rollover_{league_code}.lock"
+
+@contextmanager
+def rollover_lock(league_code):
+    """Try to take a league's rollover lock without waiting; yields whether it was taken.
+
+    The OS releases the lock when its holder exits, so a crashed or
+    restarted server never leaves a rollover looking like it is running.
+    """
+    with open(get_rollover_lock_file(league_code), "a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def is_rollover_running(league_code):
+    with rollover_lock(league_code) as acquired:
+        return not acquired
+
+def load_rollover_status(league_code):
+    """Progress of a league's most recent season rollover, or None if it never ran"""
     try:
-        with open("farmer_pool.json", "r") as f:
+        with open(get_rollover_file(league_code), "r") as f:
             return json.load(f)
     except FileNotFoundError:
-        return []
+        return None
+
+def save_rollover_status(league_code, status):
+    status["updated_at"] = datetime.now().isoformat()
+    atomic_write_json(get_rollover_file(league_code), status)
+
+def start_rollover_status(league_code):
+    """Mark a rollover as queued, keeping finished stages if the last attempt failed part way"""
+    status = load_rollover_status(league_code)
+    if status is None or status["status"] == "completed":
+        status = {"league_code": league_code, "completed_stages": [], "started_at": datetime.now().isoformat()}
+    status.update({"status": "queued", "current_stage": None, "error": None})
+    save_rollover_status(league_code, status)
+    return status
 
 def continue_league_new_season(league_code):
-    """Main function to continue a league with a new season"""
+    """Main function to continue a league with a new season.
+
+    Progress is checkpointed to season_rollover_<code>.json after each
+    stage. Once the league is reset its stats are gone, so a rollover that
+    failed part way must resume from the first unfinished stage rather than
+    start over; calling this again does exactly that.
+
+    Returns None without doing anything if another rollover of the league
+    is already running.
+    """
+    with rollover_lock(league_code) as acquired:
+        if not acquired:
+            print(f"A season rollover for league {league_code} is already running")
+            return None
+        return run_rollover_stages(league_code)
+
+def run_rollover_stages(league_code):
+    """Run the unfinished rollover stages; call while holding rollover_lock()"""
     print(f"Starting new season progression for league {league_code}...")
     
-    # Archive previous season performance
-    if not archive_season_performance(league_code):
-        print("Failed to archive season performance")
-        return False
-    
-    print("Previous season performance archived successfully")
+    status = load_rollover_status(league_code)
+    if status is None or status["status"] == "completed":
+        status = start_rollover_status(league_code)
+    status["status"] = "running"
     
-    # Calculate and apply stat progression
-    if not calculate_stat_progression(league_code):
-        print("Failed to calculate stat progression")
-        return False
-    
-    print("Farmer stat progression calculated and applied")
-    
-    # Reset league for new season
-    if not reset_league_for_new_season(league_code):
-        print("Failed to reset league for new season")
-        return False
+    for stage, run_stage, message in ROLLOVER_STAGES:
+        if stage in status["completed_stages"]:
+            print(f"Stage '{stage}' already done, skipping")
+            continue
+        
+        status["current_stage"] = stage
+        save_rollover_status(league_code, status)
+        
+        try:
+            succeeded = run_stage(league_code)
+            error = None if succeeded else f"Stage '{stage}' failed"
+        except Exception as e:
+            error = f"Stage '{stage}' failed: {e}"
+        
+        if error:
+            print(error)
+            status.update({"status": "failed", "error": error})
+            save_rollover_status(league_code, status)
+            return False
+        
+        print(message)
+        status["completed_stages"].append(stage)
+        save_rollover_status(league_code, status)
     
+    status.update({"status": "completed", "current_stage": None})
+    save_rollover_status(league_code, status)
     print(f"League {league_code} successfully reset for new season with evolved farmer stats!")
     return True
 
@@ -537,6 +714,8 @@ if __name__ == "__main__":
     
     if success:
         print("League continuation completed successfully!")
+    elif success is None:
+        sys.exit(1)
     else:
         print("League continuation failed!")
         sys.exit(1)
@@ -4,7 +4,8 @@ import sys
 import os
 import traceback
 from tasks import get_task_for_job
-from stats import get_user_stats, update_user_stats
+from store import load_leagues
+from stats import get_user_stats, update_user_stats, add_running_totals
 
 def load_seasonal_crops():
     try:
@@ -191,8 +192,7 @@ def main():
     # Get user's league to load the correct farmer pool
     def get_user_league_code(username):
         try:
-            with open("leagues.json", "r") as f:
-                leagues = json.load(f)
+            leagues = load_leagues()
             for code, league in leagues.items():
                 if username in league.get("players", []):
                     return code
@@ -310,7 +310,7 @@ def main():
 
         # Add empty matchday data
         user_data["matchday"] += 1
-        user_data["data"].append({
+        entry = {
             "matchday": user_data["matchday"],
             "season": season,
             "daily_crop": daily_crop,
@@ -318,7 +318,9 @@ def main():
             "affected_farmer": None,
             "story_message": story_message,
             "farmers": []
-        })
+        }
+        add_running_totals(user_data, entry)
+        user_data["data"].append(entry)
 
         update_user_stats(username, user_data)
         print(f"\n📖 {story_message}")
@@ -331,8 +333,7 @@ def main():
     # Get season from user's league settings
     def get_user_league_season(username):
         try:
-            with open("leagues.json", "r") as f:
-                leagues = json.load(f)
+            leagues = load_leagues()
             for league in leagues.values():
                 if username in league.get("players", []):
                     return league.get("season", "summer")
@@ -443,7 +444,7 @@ def main():
         json.dump(all_stories, sf, indent=4)
 
     user_data["matchday"] += 1
-    user_data["data"].append({
+    entry = {
         "matchday": user_data["matchday"],
         "season": season,
         "daily_crop": daily_crop,
@@ -464,7 +465,10 @@ def main():
             }
             for c in characters
         ]
-    })
+    }
+    # Stamp cumulative columns from running totals so history renders per day
+    add_running_totals(user_data, entry)
+    user_data["data"].append(entry)
 
     # Update season-long injury stats
     total_injuries = sum(c.injuries_this_season for c in characters)
@@ -0,0 +1,140 @@
+import os
+import json
+import copy
+import fcntl
+from contextlib import contextmanager
+from datetime import datetime
+from store import atomic_write_json
+
+# How many times a pick or skip is re-applied after losing a compare-and-swap
+MAX_DRAFT_RETRIES = 5
+
+def get_draft_file(league_code):
+    return f"draft_{league_code}.json"
+
+def get_draft_lock_file(league_code):
+    return f".draft_{league_code}.lock"
+
+def new_draft_state(league=None):
+    """Draft state at version 0, carried over from the league document if it still holds one"""
+    league = league or {}
+    return {
+        "version": 0,
+        "picks_made": league.get("picks_made", 0),
+        "picked_farmers": league.get("picked_farmers", []),
+        "user_drafts": league.get("user_drafts", {}),
+        "pick_start_time": league.get("pick_start_time"),
+        "last_pick_message": league.get("last_pick_message", "")
+    }
+
+def read_draft_state(league_code, league=None):
+    """Load a league's draft state; callers get their own copy to modify"""
+    try:
+        with open(get_draft_file(league_code), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return new_draft_state(league)
+
+@contextmanager
+def draft_lock(league_code):
+    """Lock one league's draft file; other leagues' drafts are not blocked"""
+    with open(get_draft_lock_file(league_code), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def compare_and_swap(league_code, expected_version, state):
+    """Save `state` as the next version only if the stored version is still `expected_version`.
+
+    Returns the saved state, or None if another writer got there first.
+    The lock is held just for the version check and the write.
+    """
+    with draft_lock(league_code):
+        try:
+            with open(get_draft_file(league_code), "r") as f:
+                current_version = json.load(f)["version"]
+        except FileNotFoundError:
+            current_version = 0
+
+        if current_version != expected_version:
+            return None
+
+        state = dict(state, version=expected_version + 1)
+        atomic_write_json(get_draft_file(league_code), state)
+        return state
+
+def get_current_turn(state, snake_order):
+    """Whose pick it is, or None once the draft is complete"""
+    picks_made = state["picks_made"]
+    return snake_order[picks_made] if picks_made < len(snake_order) else None
+
+def is_draft_finished(state, snake_order):
+    return state["picks_made"] >= len(snake_order)
+
+def make_pick(state, snake_order, username, farmer, role):
+    """Draft transition: `username` takes `farmer` for `role`. Returns (new state, error)"""
+    if get_current_turn(state, snake_order) != username:
+        return None, "It's not your turn!"
+
+    if any(f["name"] == farmer["name"] for f in state["picked_farmers"]):
+        return None, "Farmer already picked!"
+
+    user_draft = state["user_drafts"].setdefault(username, {})
+    if role in user_draft:
+        return None, "Role already filled!"
+
+    state["picked_farmers"].append(farmer)
+    user_draft[role] = farmer
+    state["picks_made"] += 1
+
+    # Reset timer for next player's turn
+    state["pick_start_time"] = datetime.now().isoformat()
+    state["last_pick_message"] = f"{username} selected {farmer['name']} as {role}"
+    return state, None
+
+def skip_pick(state, snake_order, username, pick_number=None):
+    """Draft transition: `username` runs out of time. Returns (new state, error).
+
+    If `pick_number` is given the skip only applies to that pick, so a late
+    timer cannot skip the same player's next pick at the turn of the snake.
+    """
+    if get_current_turn(state, snake_order) != username:
+        return None, "Not your turn"
+    if pick_number is not None and pick_number != state["picks_made"]:
+        return None, "Not your turn"
+
+    state["picks_made"] += 1
+
+    # Reset timer for next player's turn
+    state["pick_start_time"] = datetime.now().isoformat()
+    state["last_pick_message"] = f"{username} was skipped for taking too long"
+    return state, None
+
+def apply_draft_transition(league_code, league, transition, *args):
+    """Apply a draft transition with optimistic concurrency.
+
+    The transition runs against the latest state and is saved with
+    compare_and_swap; if another pick or skip landed in between it is
+    re-run against the new state, where it may no longer be valid.
+    Returns (saved state, error).
+    """
+    for _ in range(MAX_DRAFT_RETRIES):
+        state = read_draft_state(league_code, league)
+        expected_version = state["version"]
+
+        new_state, error = transition(copy.deepcopy(state), league.get("snake_order", []), *args)
+        if error:
+            return None, error
+
+        saved = compare_and_swap(league_code, expected_version, new_state)
+        if saved is not None:
+            return saved, None
+
+    return None, "The draft is busy, please try again."
+
+def remove_draft_state(league_code):
+    for path in (get_draft_file(league_code), get_draft_lock_file(league_code)):
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,72 @@
+import logging
+import threading
+from datetime import datetime
+
+# Event types emitted by the game engine
+MATCHDAY_COMPLETED = "matchday_completed"
+PICK_MADE = "pick_made"
+DRAFT_READY = "draft_ready"
+DRAFT_SCHEDULED = "draft_scheduled"
+LEAGUE_MEMBERS_CHANGED = "league_members_changed"
+TRADE_PROPOSED = "trade_proposed"
+TRADE_ACCEPTED = "trade_accepted"
+TRADE_REJECTED = "trade_rejected"
+FARMER_SWAPPED = "farmer_swapped"
+CHAT_MESSAGE = "chat_message"
+
+# Subscribe to this to receive every event regardless of type
+ALL_EVENTS = "*"
+
+class EventBus:
+    """In-process publish/subscribe bus for game state changes.
+
+    Handlers run synchronously on the publishing thread (a request thread or
+    the matchday scheduler), so they should be quick: invalidate a cache,
+    enqueue work, or push to a stream.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_type, handler):
+        """Register a handler for an event type"""
+        with self._lock:
+            self._subscribers.setdefault(event_type, []).append(handler)
+        return handler
+
+    def unsubscribe(self, event_type, handler):
+        """Remove a previously registered handler"""
+        with self._lock:
+            handlers = self._subscribers.get(event_type, [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+    def on(self, event_type):
+        """Decorator form of subscribe"""
+        def decorator(handler):
+            return self.subscribe(event_type, handler)
+        return decorator
+
+    def publish(self, event_type, **payload):
+        """Deliver an event to all handlers of its type and to wildcard handlers"""
+        event = {
+            "type": event_type,
+            "timestamp": datetime.now().isoformat(),
+            **payload
+        }
+
+        with self._lock:
+            handlers = list(self._subscribers.get(event_type, []))
+            handlers += self._subscribers.get(ALL_EVENTS, [])
+
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                # A broken subscriber must never break the action that published
+                logging.error(f"Error handling {event_type} event in {handler}: {e}")
+
+        return event
+
+event_bus = EventBus()
@@ -0,0 +1,127 @@
+import json
+import os
+from datetime import datetime
+from stats import load_stats
+from store import load_leagues, atomic_write_json, store_lock
+
+LEADERBOARDS_FILE = "leaderboards.json"
+
+def load_leaderboards():
+    """Load the materialized leaderboard views"""
+    if not os.path.exists(LEADERBOARDS_FILE):
+        return {"global": [], "leagues": {}}
+    with open(LEADERBOARDS_FILE, "r") as f:
+        return json.load(f)
+
+def save_leaderboards(leaderboards):
+    atomic_write_json(LEADERBOARDS_FILE, leaderboards)
+
+def get_season_totals(all_stats):
+    """Total season points for every user with stats"""
+    return {
+        username: sum(
+            sum(farmer["points_after_catastrophe"] for farmer in day["farmers"])
+            for day in user_data.get("data", [])
+        )
+        for username, user_data in all_stats["users"].items()
+    }
+
+def build_global_leaderboard(season_totals):
+    """Every user sorted by total season points"""
+    entries = [{"username": username, "total_points": total} for username, total in season_totals.items()]
+    entries.sort(key=lambda x: x["total_points"], reverse=True)
+    return entries
+
+def build_league_leaderboard(league, season_totals):
+    """Sorted standings for one league, split into bracket tiers once brackets exist"""
+    use_playoffs = league.get("use_playoffs", True)
+    playoff_records = league.get("playoff_records", {})
+
+    entries = []
+    for username in league.get("players", []):
+        if username not in season_totals:
+            continue
+        entry = {"username": username, "total_points": season_totals[username]}
+        if use_playoffs:
+            record = playoff_records.get(username, {"wins": 0, "losses": 0, "ties": 0})
+            entry.update({
+                "wins": record["wins"],
+                "losses": record["losses"],
+                "ties": record["ties"]
+            })
+        entries.append(entry)
+
+    brackets = league.get("playoff_brackets", {})
+    winners_bracket = brackets.get("winners", [])
+    losers_bracket = brackets.get("losers", [])
+
+    if use_playoffs and league.get("brackets_created", False):
+        # Playoff season: winners bracket ranks above losers bracket, then wins and points
+        def get_bracket_sort_key(x):
+            if x["username"] in winners_bracket:
+                return (2, x.get("wins", 0), x["total_points"])
+            elif x["username"] in losers_bracket:
+                return (1, x.get("wins", 0), x["total_points"])
+            else:
+                return (0, x.get("wins", 0), x["total_points"])
+
+        entries.sort(key=get_bracket_sort_key, reverse=True)
+    elif use_playoffs:
+        # Regular season: sort by wins then points
+        entries.sort(key=lambda x: (x.get("wins", 0), x["total_points"]), reverse=True)
+    else:
+        # Points system: sort by total points
+        entries.sort(key=lambda x: x["total_points"], reverse=True)
+
+    return {
+        "players": sorted(entry["username"] for entry in entries),
+        "entries": entries,
+        "brackets": {
+            "winners": [entry for entry in entries if entry["username"] in winners_bracket],
+            "losers": [entry for entry in entries if entry["username"] in losers_bracket]
+        }
+    }
+
+def refresh_leaderboards(league_codes=None):
+    """Recompute the global view and the given leagues' views (all leagues if None).
+
+    Runs under the store lock so refreshes of different leagues can't drop
+    each other's views.
+    """
+    with store_lock():
+        all_stats = load_stats()
+        leagues = load_leagues()
+        season_totals = get_season_totals(all_stats)
+
+        leaderboards = load_leaderboards()
+        league_views = leaderboards.get("leagues", {})
+
+        # Drop views for leagues that no longer exist
+        league_views = {code: view for code, view in league_views.items() if code in leagues}
+
+        for code in (league_codes if league_codes is not None else leagues.keys()):
+            if code in leagues:
+                league_views[code] = build_league_leaderboard(leagues[code], season_totals)
+
+        leaderboards = {
+            "global": build_global_leaderboard(season_totals),
+            "leagues": league_views,
+            "refreshed_at": datetime.now().isoformat()
+        }
+        save_leaderboards(leaderboards)
+    return leaderboards
+
+def get_leaderboards(league):
+    """Read the global view and a league's view, rebuilding only if the league's membership changed"""
+    leaderboards = load_leaderboards()
+    league_view = None
+
+    if league:
+        league_view = leaderboards.get("leagues", {}).get(league["code"])
+        ranked_users = {entry["username"] for entry in leaderboards["global"]}
+        if league_view is None or league_view["players"] != sorted(
+                p for p in league["players"] if p in ranked_users):
+            leaderboards = refresh_leaderboards([league["code"]])
+            league_view = leaderboards["leagues"].get(league["code"])
+
+    return leaderboards["global"], league_view
@@ -1,13 +1,30 @@
 import json
 import os
 import random
+from collections import deque
+from datetime import datetime
 from tasks import get_task_for_job
+from store import load_leagues, atomic_write_json
+from ownership import load_ownership_index, get_drafted_farmer_names
+from pools import get_farmer_pool, get_league_pool_file
 
-MARKET_STATS_FILE = "market_stats.json"
+# Global market files from before markets were kept per league; only read to migrate them
+LEGACY_MARKET_STATS_FILE = "market_stats.json"
+LEGACY_MARKET_ASSIGNMENTS_FILE = "market_assignments.json"
+
+# Market form is tracked over a rolling window of this many matchdays
+MARKET_FORM_LENGTH = 5
+
+def get_market_stats_file(league_code):
+    return f"market_stats_{league_code}.json"
+
+def get_market_assignments_file(league_code):
+    return f"market_assignments_{league_code}.json"
 
 class MarketManager:
-    def __init__(self):
-        self.stats_file = MARKET_STATS_FILE
+    def __init__(self, league_code):
+        # Each league's market is tracked separately
+        self.stats_file = get_market_stats_file(league_code)
     
     def load_market_stats(self):
         if not os.path.exists(self.stats_file):
@@ -16,14 +33,14 @@ class MarketManager:
             return json.load(f)
     
     def save_market_stats(self, stats):
-        with open(self.stats_file, "w") as f:
-            json.dump(stats, f, indent=4)
+        atomic_write_json(self.stats_file, stats)
     
     def get_market_stats(self):
         """Get performance statistics for undrafted farmers"""
-        stats = self.load_market_stats()
-        
-        # Calculate derived stats
+        return self.add_derived_stats(self.load_market_stats())
+
+    def add_derived_stats(self, stats):
+        """Fill in average and recent-form average for each farmer"""
         for farmer_name, data in stats.items():
             if data["matchdays_played"] > 0:
                 data["avg_points"] = data["total_points"] / data["matchdays_played"]
@@ -39,10 +56,8 @@ class MarketManager:
         
         return stats
     
-    def update_farmer_performance(self, farmer_name, points, role):
-        """Update performance stats for a market farmer (max 5 matchdays)"""
-        stats = self.load_market_stats()
-        
+    def _apply_performance(self, stats, farmer_name, points, role):
+        """Add one performance to a farmer's stats in memory (max 5 matchdays)"""
         if farmer_name not in stats:
             stats[farmer_name] = {
                 "total_points": 0,
@@ -52,10 +67,10 @@ class MarketManager:
             }
         
         farmer_stats = stats[farmer_name]
+        recent_form = deque(farmer_stats["recent_form"], maxlen=MARKET_FORM_LENGTH)
         
         # Only track up to 5 matchdays
-        if farmer_stats["matchdays_played"] < 5:
-            farmer_stats["total_points"] += points
+        if farmer_stats["matchdays_played"] < MARKET_FORM_LENGTH:
             farmer_stats["matchdays_played"] += 1
             
             # Track role performance
@@ -63,108 +78,277 @@ class MarketManager:
                 farmer_stats["roles_played"][role] = {"count": 0, "total_points": 0}
             farmer_stats["roles_played"][role]["count"] += 1
             farmer_stats["roles_played"][role]["total_points"] += points
-            
-            # Update recent form (exactly 5 entries max)
-            farmer_stats["recent_form"].append(points)
         else:
-            # Roll over - remove oldest, add newest
-            farmer_stats["total_points"] = farmer_stats["total_points"] - farmer_stats["recent_form"][0] + points
-            farmer_stats["recent_form"] = farmer_stats["recent_form"][1:] + [points]
+            # Roll over - the oldest performance falls out of the window
+            farmer_stats["total_points"] -= recent_form[0]
         
+        farmer_stats["total_points"] += points
+        recent_form.append(points)
+        farmer_stats["recent_form"] = list(recent_form)
+    
+    def record_matchday(self, results):
+        """Apply a whole market matchday of (farmer_name, points, role) results with one read and one write"""
+        stats = self.load_market_stats()
+        for farmer_name, points, role in results:
+            self._apply_performance(stats, farmer_name, points, role)
         self.save_market_stats(stats)
+        return self.add_derived_stats(stats)
+
+def get_undrafted_farmers(league_code=None):
+    """Get farmers not on any team in the league (or in any league if no code is given)"""
+    leagues = load_leagues()
+
+    if league_code:
+        league = leagues.get(league_code, {})
+        farmer_pool = get_farmer_pool(league_code).farmers
+        drafted_farmers = set(load_ownership_index(league_code, league.get("players", []))["farmers"])
+    else:
+        farmer_pool = get_farmer_pool().farmers
+        drafted_farmers = set()
+        for code, league in leagues.items():
+            drafted_farmers.update(load_ownership_index(code, league.get("players", []))["farmers"])
 
-def get_undrafted_farmers():
-    """Get list of farmers not currently drafted by any user"""
-    # Load farmer pool
-    try:
-        with open("farmer_pool.json", "r") as f:
-            farmer_pool = json.load(f)
-    except FileNotFoundError:
-        return []
-    
-    # Load user stats to see who's drafted
-    from stats import load_stats
-    stats = load_stats()
-    
-    drafted_farmers = set()
-    for user_data in stats["users"].values():
-        for farmer_data in user_data.get("drafted_team", {}).values():
-            if isinstance(farmer_data, dict):
-                drafted_farmers.add(farmer_data["name"])
-    
     # Return undrafted farmers
-    undrafted = []
-    for farmer in farmer_pool:
-        if farmer["name"] not in drafted_farmers:
-            undrafted.append(farmer)
-    
-    return undrafted
+    return [farmer for farmer in farmer_pool if farmer["name"] not in drafted_farmers]
 
-def assign_market_farmers_to_roles():
-    """Assign farmers to their optimal roles based on best stats (excluding physical)"""
-    undrafted = get_undrafted_farmers()
-    
+def assign_market_farmers_to_roles(league_code):
+    """Assign a league's undrafted farmers to their optimal roles (best stat, excluding physical)"""
     market_assignments = {}
-    for farmer in undrafted:
-        # Find best stat (excluding physical)
-        stats = {
-            "Fix Meiser": farmer["handy"],
-            "Speed Runner": farmer["stamina"], 
-            "Lift Tender": farmer["strength"]
-        }
-        
-        # Assign to role with highest stat
-        suggested_role = max(stats.keys(), key=lambda x: stats[x])
-        
+    for farmer in get_undrafted_farmers(league_code):
         market_assignments[farmer["name"]] = {
             "farmer": farmer,
-            "role": suggested_role
+            "role": get_suggested_role(farmer)
         }
     
     # Save assignments
-    with open("market_assignments.json", "w") as f:
-        json.dump(market_assignments, f, indent=4)
+    atomic_write_json(get_market_assignments_file(league_code), market_assignments)
     
     return market_assignments
 
-def run_market_matchday():
-    """Run matchday simulation for market farmers"""
+def load_market_assignments(league_code):
     try:
-        with open("market_assignments.json", "r") as f:
-            assignments = json.load(f)
+        with open(get_market_assignments_file(league_code), "r") as f:
+            return json.load(f)
     except FileNotFoundError:
-        return
+        return {}
+
+def get_market_board_file(league_code):
+    return f"market_board_{league_code}.json"
+
+def get_suggested_role(farmer):
+    """Role matching the farmer's best stat (excluding physical)"""
+    stats = {
+        "Fix Meiser": farmer["handy"],
+        "Speed Runner": farmer["stamina"],
+        "Lift Tender": farmer["strength"]
+    }
+    return max(stats.keys(), key=lambda x: stats[x])
+
+def get_form_trend(recent_form):
+    """Classify a farmer's recent form"""
+    if len(recent_form) < 3:
+        return "unknown"
+
+    first_half = sum(recent_form[:2]) / 2
+    second_half = sum(recent_form[-2:]) / 2
+
+    if second_half > first_half + 1:
+        return "hot_streak"
+    elif first_half > second_half + 1:
+        return "cold_streak"
+    elif len(recent_form) >= 4 and max(recent_form) - min(recent_form) <= 1:
+        return "consistent"
+    return "volatile"
+
+def build_market_entry(farmer, farmer_stats, suggested_role):
+    """A market board row: pool data plus market performance and form indicators"""
+    recent_form = farmer_stats.get("recent_form", [])
+    entry = farmer.copy()
+    entry.update({
+        "total_points": farmer_stats.get("total_points", 0),
+        "matchdays_played": farmer_stats.get("matchdays_played", 0),
+        "avg_points": farmer_stats.get("avg_points", 0.0),
+        "recent_form": recent_form,
+        "suggested_role": suggested_role,
+        # Flame indicator: 5 consecutive performances with points
+        "is_hot": len(recent_form) == 5 and all(p > 0 for p in recent_form),
+        "trend": get_form_trend(recent_form)
+    })
+    return entry
+
+def rank_market_board(entries):
+    """Set each farmer's 0-100 performance rating relative to the pack and sort by average"""
+    all_avg_points = [entry["avg_points"] for entry in entries if entry["avg_points"] > 0]
+
+    if all_avg_points:
+        max_avg = max(all_avg_points)
+        min_avg = min(all_avg_points)
+        avg_range = max_avg - min_avg if max_avg > min_avg else 1
+
+    for entry in entries:
+        if entry["avg_points"] > 0:
+            entry["performance_rating"] = int(((entry["avg_points"] - min_avg) / avg_range) * 100)
+        else:
+            entry["performance_rating"] = 0
+
+    entries.sort(key=lambda x: x["avg_points"], reverse=True)
+    return entries
+
+def save_market_board(league_code, entries):
+    board = {
+        "league_code": league_code,
+        "farmers": entries,
+        "updated_at": datetime.now().isoformat()
+    }
+    atomic_write_json(get_market_board_file(league_code), board)
+    return board
+
+def load_market_board(league_code):
+    """Load a league's precomputed market board (None if not built yet)"""
+    try:
+        with open(get_market_board_file(league_code), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def build_market_board(league_code, players, market_stats=None, assignments=None):
+    """Build and save the market board for a league from its pool and undrafted farmers"""
+    if market_stats is None:
+        market_stats = MarketManager(league_code).get_market_stats()
+    if assignments is None:
+        assignments = load_market_assignments(league_code)
+
+    drafted_farmers = get_drafted_farmer_names(league_code, players)
+
+    entries = []
+    for farmer in get_farmer_pool(league_code).farmers:
+        if farmer["name"] in drafted_farmers:
+            continue
+        if farmer["name"] in assignments:
+            suggested_role = assignments[farmer["name"]]["role"]
+        else:
+            suggested_role = get_suggested_role(farmer)
+        entries.append(build_market_entry(farmer, market_stats.get(farmer["name"], {}), suggested_role))
+
+    return save_market_board(league_code, rank_market_board(entries))
+
+def update_market_board_after_swap(league_code, acquired_name, released_name=None):
+    """Move farmers on and off a league's board after a swap without rebuilding it"""
+    board = load_market_board(league_code)
+    if board is None:
+        return None
+
+    entries = [entry for entry in board["farmers"] if entry["name"] != acquired_name]
+
+    if released_name:
+        farmer = get_farmer_pool(league_code).get(released_name)
+        if farmer:
+            market_stats = MarketManager(league_code).get_market_stats()
+            entries.append(build_market_entry(farmer, market_stats.get(released_name, {}), get_suggested_role(farmer)))
+
+    return save_market_board(league_code, rank_market_board(entries))
+
+def migrate_legacy_market(leagues=None):
+    """Seed per-league market files from the old global ones, then remove them.
+
+    The global history was recorded for the default pool's farmers, so it
+    is only given to open markets still drawing from that pool. Returns the
+    codes of the leagues that were seeded.
+    """
+    legacy = {}
+    for key, path in (("stats", LEGACY_MARKET_STATS_FILE), ("assignments", LEGACY_MARKET_ASSIGNMENTS_FILE)):
+        try:
+            with open(path, "r") as f:
+                legacy[key] = json.load(f)
+        except FileNotFoundError:
+            pass
+    if not legacy:
+        return []
+
+    if leagues is None:
+        leagues = load_leagues()
+
+    migrated = []
+    for league_code, league in leagues.items():
+        if not league.get("market_initialized") or os.path.exists(get_league_pool_file(league_code)):
+            continue
+
+        seeded = False
+        for key, path in (("stats", get_market_stats_file(league_code)),
+                          ("assignments", get_market_assignments_file(league_code))):
+            if key in legacy and not os.path.exists(path):
+                atomic_write_json(path, legacy[key])
+                seeded = True
+
+        if seeded:
+            build_market_board(league_code, league.get("players", []))
+            migrated.append(league_code)
+
+    for path in (LEGACY_MARKET_STATS_FILE, LEGACY_MARKET_ASSIGNMENTS_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+
+    print(f"Migrated the global market history to leagues: {migrated}")
+    return migrated
+
+def simulate_market_performance(farmer, role):
+    """Simulate one market farmer's matchday in the given role"""
+    # Simulate performance using existing task system
+    points, results = get_task_for_job(
+        role,
+        farmer["strength"],
+        farmer["handy"],
+        farmer["stamina"],
+        farmer["name"],
+        []  # No other farmers for market simulation
+    )
     
-    market_manager = MarketManager()
+    # Apply injury/catastrophe simulation (simplified)
+    injury_loss = 0
+    if random.randint(1, 3) == 3 and random.randint(1, 11) > farmer["physical"]:
+        injury_loss = random.randint(1, 2)
     
-    # Run each farmer's performance
-    for farmer_name, assignment in assignments.items():
-        farmer = assignment["farmer"]
-        role = assignment["role"]
-        
-        # Simulate performance using existing task system
-        points, results = get_task_for_job(
-            role,
-            farmer["strength"],
-            farmer["handy"],
-            farmer["stamina"],
-            farmer["name"],
-            []  # No other farmers for market simulation
-        )
-        
-        # Apply injury/catastrophe simulation (simplified)
-        injury_loss = 0
-        if random.randint(1, 3) == 3 and random.randint(1, 11) > farmer["physical"]:
-            injury_loss = random.randint(1, 2)
-        
-        final_points = max(0, points - injury_loss)
-        
-        # Update market stats
-        market_manager.update_farmer_performance(farmer_name, final_points, role)
+    return max(0, points - injury_loss)
+
+def run_market_matchday(leagues=None):
+    """Run the market matchday for every open league market.
+
+    Farmers are simulated once per distinct pool version (covering every
+    farmer undrafted in any league with that pool), then each league
+    records the results for its own undrafted farmers and snapshots its
+    market board.
+    """
+    if leagues is None:
+        leagues = load_leagues()
+    
+    # Group open markets by the pool they draw from
+    pool_groups = {}
+    for league_code, league in leagues.items():
+        if not league.get("market_initialized") or league.get("status") == "finished":
+            continue
+        assignments = assign_market_farmers_to_roles(league_code)
+        version = get_farmer_pool(league_code).version
+        group = pool_groups.setdefault(version, {"assignments": {}, "leagues": []})
+        group["assignments"].update(assignments)
+        group["leagues"].append((league_code, league, assignments))
+    
+    for version, group in pool_groups.items():
+        # Run each farmer's performance once for all leagues sharing this pool
+        performances = {}
+        for farmer_name, assignment in group["assignments"].items():
+            performances[farmer_name] = simulate_market_performance(assignment["farmer"], assignment["role"])
+            print(f"[Market {version[:8]}] {farmer_name} ({assignment['role']}): {performances[farmer_name]} points")
         
-        print(f"[Market] {farmer_name} ({role}): {final_points} points")
+        for league_code, league, assignments in group["leagues"]:
+            # Persist the league's whole matchday at once
+            market_stats = MarketManager(league_code).record_matchday(
+                (farmer_name, performances[farmer_name], assignment["role"])
+                for farmer_name, assignment in assignments.items()
+            )
+            
+            # Snapshot the market so /market is a single read until the next matchday
+            build_market_board(league_code, league["players"], market_stats, assignments)
 
 if __name__ == "__main__":
     # Test the market system
-    assign_market_farmers_to_roles()
     run_market_matchday()
@@ -0,0 +1,67 @@
+import json
+import os
+from stats import load_stats
+from store import atomic_write_json
+
+def get_ownership_file(league_code):
+    return f"ownership_{league_code}.json"
+
+def save_ownership_index(league_code, index):
+    atomic_write_json(get_ownership_file(league_code), index)
+
+def build_ownership_index(league_code, players, all_stats=None):
+    """Rebuild a league's farmer -> {owner, role} index from its members' teams"""
+    if all_stats is None:
+        all_stats = load_stats()
+
+    farmers = {}
+    for player in players:
+        for role, farmer_data in all_stats["users"].get(player, {}).get("drafted_team", {}).items():
+            if isinstance(farmer_data, dict):
+                farmers[farmer_data["name"]] = {"owner": player, "role": role}
+
+    index = {"players": sorted(players), "farmers": farmers}
+    save_ownership_index(league_code, index)
+    return index
+
+def load_ownership_index(league_code, players):
+    """Load a league's ownership index, rebuilding it if missing or if membership changed"""
+    try:
+        with open(get_ownership_file(league_code), "r") as f:
+            index = json.load(f)
+    except FileNotFoundError:
+        index = None
+
+    if index is None or index["players"] != sorted(players):
+        index = build_ownership_index(league_code, players)
+    return index
+
+def apply_team_ownership(index, teams):
+    """Replace the index entries of each user in `teams` (username -> drafted_team) in memory"""
+    farmers = {name: owner for name, owner in index["farmers"].items() if owner["owner"] not in teams}
+    for username, drafted_team in teams.items():
+        for role, farmer_data in drafted_team.items():
+            if isinstance(farmer_data, dict):
+                farmers[farmer_data["name"]] = {"owner": username, "role": role}
+
+    index["farmers"] = farmers
+    return index
+
+def set_team_ownership(league_code, players, teams):
+    """Update and save the index entries of each user in `teams`"""
+    index = apply_team_ownership(load_ownership_index(league_code, players), teams)
+    save_ownership_index(league_code, index)
+    return index
+
+def get_farmer_owner(league_code, players, farmer_name):
+    """Get {owner, role} for a drafted farmer in a league, or None if available"""
+    return load_ownership_index(league_code, players)["farmers"].get(farmer_name)
+
+def get_drafted_farmer_names(league_code, players):
+    """Names of all farmers on a team in the league"""
+    return set(load_ownership_index(league_code, players)["farmers"])
+
+def remove_ownership_index(league_code):
+    ownership_file = get_ownership_file(league_code)
+    if os.path.exists(ownership_file):
+        os.remove(ownership_file)
@@ -0,0 +1,75 @@
+import json
+import hashlib
+from store import store_generation
+
+DEFAULT_POOL_FILE = "farmer_pool.json"
+
+# Loaded pools keyed by file -> (file generation, FarmerPool), and by content hash
+_pools = {}
+_pools_by_version = {}
+
+def get_league_pool_file(league_code):
+    return f"farmer_pool_{league_code}.json"
+
+def get_pool_version(farmers):
+    """Content hash of a farmer pool; leagues with equal versions share market simulation"""
+    return hashlib.sha1(json.dumps(farmers, sort_keys=True).encode("utf-8")).hexdigest()
+
+class FarmerPool:
+    """A loaded farmer pool with lookup by name.
+
+    The farmer dicts are shared by every caller of the registry, so treat
+    them as read-only; use copy_farmers() for a list that can be changed.
+    """
+
+    def __init__(self, farmers, source):
+        self.farmers = farmers
+        self.source = source
+        self.version = get_pool_version(farmers)
+        self.by_name = {farmer["name"]: farmer for farmer in farmers}
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+    def copy_farmers(self):
+        return [farmer.copy() for farmer in self.farmers]
+
+def _forget_pool_file(pool_file):
+    """Drop a file's cached pool, and its version entry if no other file shares it"""
+    cached = _pools.pop(pool_file, None)
+    if cached and not any(pool is cached[1] for _, pool in _pools.values()):
+        _pools_by_version.pop(cached[1].version, None)
+
+def _load_pool_file(pool_file):
+    """Get the pool stored in a file, or None if there is no such file"""
+    generation = store_generation(pool_file)
+    if generation == "0":
+        _forget_pool_file(pool_file)
+        return None
+
+    cached = _pools.get(pool_file)
+    if cached and cached[0] == generation:
+        return cached[1]
+    _forget_pool_file(pool_file)
+
+    with open(pool_file, "r") as f:
+        farmers = json.load(f)
+
+    # Files with identical contents (e.g. leagues that never evolved) share one pool
+    pool = FarmerPool(farmers, pool_file)
+    pool = _pools_by_version.setdefault(pool.version, pool)
+    _pools[pool_file] = (generation, pool)
+    return pool
+
+def get_farmer_pool(league_code=None):
+    """The league's evolved pool if it has one, otherwise the default pool"""
+    if league_code:
+        pool = _load_pool_file(get_league_pool_file(league_code))
+        if pool is not None:
+            return pool
+
+    return _load_pool_file(DEFAULT_POOL_FILE) or FarmerPool([], DEFAULT_POOL_FILE)
+
+def invalidate_pool(league_code=None):
+    """Forget a cached pool after its file is rewritten (the default pool if no league is given)"""
+    _forget_pool_file(get_league_pool_file(league_code) if league_code else DEFAULT_POOL_FILE)
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import random
+
+def get_schedule_seed(*parts):
+    """Stable integer seed from strings; unlike hash() it is the same in every process"""
+    digest = hashlib.sha256(":".join(parts).encode("utf-8")).hexdigest()
+    return int(digest[:16], 16)
+
+def circle_method_schedule(players, total_cycles, seed=None):
+    """Round-robin schedule {player: [opponent per cycle]} using the circle method.
+
+    With an odd number of players a None slot is added, and whoever draws
+    it has a bye (None) that cycle. Every n-1 cycles each player meets every
+    other player exactly once, then the rotation repeats. The seating order
+    is shuffled from `seed` so different leagues get different pairings.
+    """
+    if not players:
+        return {}
+
+    seats = list(players)
+    if seed is not None:
+        random.Random(seed).shuffle(seats)
+    if len(seats) % 2 == 1:
+        seats.append(None)
+
+    schedule = {player: [] for player in players}
+    fixed, rotating = seats[0], seats[1:]
+    rounds = len(rotating)
+    half = len(seats) // 2
+
+    for cycle in range(total_cycles):
+        # Rotate the ring by the round number instead of shifting it each cycle
+        shift = cycle % rounds
+        ring = rotating[shift:] + rotating[:shift]
+        order = [fixed] + ring
+        for i in range(half):
+            home, away = order[i], order[-1 - i]
+            if home is not None:
+                schedule[home].append(away)
+            if away is not None:
+                schedule[away].append(home)
+
+    return schedule
+
+def verify_schedule(schedule):
+    """Check a schedule is mutual, has no self matchups and no repeats within a round-robin"""
+    players = list(schedule)
+    total_cycles = len(schedule[players[0]]) if players else 0
+    rounds = len(players) - 1 if len(players) % 2 == 0 else len(players)
+
+    for player, opponents in schedule.items():
+        if len(opponents) != total_cycles:
+            return False
+        for cycle, opponent in enumerate(opponents):
+            if opponent is None:
+                continue
+            if opponent == player or schedule.get(opponent, [None] * total_cycles)[cycle] != player:
+                return False
+        # Within each full round-robin nobody is met twice
+        for start in range(0, total_cycles, max(rounds, 1)):
+            window = [o for o in opponents[start:start + rounds] if o is not None]
+            if len(window) != len(set(window)):
+                return False
+
+    return True
+
+def get_schedule_fingerprint(schedule):
+    """Short digest of a schedule, for telling whether a cached one is still current"""
+    encoded = json.dumps(schedule, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()[:12]
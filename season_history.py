@@ -0,0 +1,109 @@
+import json
+import os
+from store import store_generation, atomic_write_json
+
+# Seasons shown in draft room trends
+TREND_SEASONS = 3
+
+# Loaded histories keyed by league code -> (file generation, history)
+_history_cache = {}
+
+def get_season_history_file(league_code):
+    return f"season_history_{league_code}.json"
+
+def new_season_history():
+    return {"seasons": [], "farmers": {}}
+
+def summarize_performance(performance):
+    """The per-season fields kept for a farmer"""
+    return {
+        "total_points": performance.get("total_points", 0),
+        "total_injuries": performance.get("total_injuries", 0),
+        "games_played": performance.get("games_played", 0),
+        "simulated_games": performance.get("simulated_games", 0),
+        "was_drafted": performance.get("was_drafted", False),
+        "best_role": performance.get("best_role")
+    }
+
+def read_season_history(league_code):
+    """Read a league's history from disk, seeding it from a lone previous_szn_stats file if needed"""
+    try:
+        with open(get_season_history_file(league_code), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        pass
+
+    history = new_season_history()
+    try:
+        with open(f"previous_szn_stats_{league_code}.json", "r") as f:
+            archived_performance = json.load(f)
+    except FileNotFoundError:
+        return history
+
+    history["seasons"].append({"season": 1, "completed_at": None})
+    for farmer_name, performance in archived_performance.items():
+        history["farmers"][farmer_name] = [dict(summarize_performance(performance), season=1)]
+    return history
+
+def load_season_history(league_code):
+    """Get a league's season history, re-reading only when the file has changed"""
+    generation = store_generation(get_season_history_file(league_code))
+    cached = _history_cache.get(league_code)
+    if cached and cached[0] == generation:
+        return cached[1]
+
+    history = read_season_history(league_code)
+    _history_cache[league_code] = (generation, history)
+    return history
+
+def record_season(league_code, archived_performance, completed_at=None):
+    """Append a finished season's archived performance to the league's history.
+
+    Recording the same season again (same completed_at) replaces it rather
+    than adding a duplicate.
+    """
+    history = read_season_history(league_code)
+    seasons = history["seasons"]
+
+    if seasons and completed_at is not None and seasons[-1]["completed_at"] == completed_at:
+        season_number = seasons[-1]["season"]
+    else:
+        season_number = seasons[-1]["season"] + 1 if seasons else 1
+        seasons.append({"season": season_number, "completed_at": completed_at})
+
+    for farmer_name, performance in archived_performance.items():
+        entries = [entry for entry in history["farmers"].get(farmer_name, []) if entry["season"] != season_number]
+        entries.append(dict(summarize_performance(performance), season=season_number))
+        history["farmers"][farmer_name] = entries
+
+    atomic_write_json(get_season_history_file(league_code), history)
+    return season_number
+
+def get_last_season_stats(history, farmer_name):
+    """A farmer's most recent season, or None if they have no history"""
+    entries = history["farmers"].get(farmer_name)
+    return entries[-1] if entries else None
+
+def get_farmer_trend(history, farmer_name, seasons=TREND_SEASONS):
+    """Points and injuries over a farmer's last `seasons` seasons, oldest first"""
+    entries = history["farmers"].get(farmer_name, [])[-seasons:]
+    if not entries:
+        return None
+
+    points = [entry["total_points"] for entry in entries]
+    return {
+        "seasons": [entry["season"] for entry in entries],
+        "points": points,
+        "injuries": [entry["total_injuries"] for entry in entries],
+        "avg_points": [
+            round(entry["total_points"] / entry["games_played"], 1) if entry["games_played"] else 0
+            for entry in entries
+        ],
+        "points_change": points[-1] - points[-2] if len(points) > 1 else None
+    }
+
+def remove_season_history(league_code):
+    history_file = get_season_history_file(league_code)
+    if os.path.exists(history_file):
+        os.remove(history_file)
+    _history_cache.pop(league_code, None)
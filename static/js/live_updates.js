@@ -0,0 +1,52 @@
+/**
+ * Live League Updates for Farmington
+ * Subscribes to the /api/stream Server-Sent Events endpoint so pages react to
+ * picks, matchdays, swaps and trades as they happen instead of polling
+ */
+
+class LiveUpdates {
+    constructor(leagueCode) {
+        this.leagueCode = leagueCode || '';
+        this.source = null;
+        this.supported = typeof window.EventSource !== 'undefined';
+    }
+
+    /**
+     * Open the league stream if it isn't already open
+     */
+    connect() {
+        if (!this.supported || this.source) return;
+
+        const query = this.leagueCode ? `?league_code=${encodeURIComponent(this.leagueCode)}` : '';
+        this.source = new EventSource(`/api/stream${query}`);
+
+        // EventSource reconnects on its own, just note it for debugging
+        this.source.onerror = () => {
+            console.warn('Live updates connection interrupted, reconnecting...');
+        };
+    }
+
+    /**
+     * Register a handler for an event type.
+     * Returns false when the browser can't stream so callers can fall back to polling.
+     */
+    on(eventType, handler) {
+        if (!this.supported) return false;
+
+        this.connect();
+        this.source.addEventListener(eventType, (e) => {
+            handler(JSON.parse(e.data));
+        });
+        return true;
+    }
+
+    /**
+     * Close the stream (e.g. before navigating away on our own)
+     */
+    close() {
+        if (this.source) {
+            this.source.close();
+            this.source = null;
+        }
+    }
+}
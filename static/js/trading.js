@@ -402,7 +402,16 @@ class TradingManager {
      * Setup auto-refresh for trade updates
      */
     setupAutoRefresh() {
-        // Refresh every 30 seconds to check for new trades
+        // Check for new trades whenever the league stream reports trade activity
+        if (typeof LiveUpdates !== 'undefined') {
+            const liveUpdates = new LiveUpdates(window.FARMINGTON_LEAGUE_CODE);
+            const refresh = () => this.checkForTradeUpdates();
+            const streaming = ['trade_proposed', 'trade_accepted', 'trade_rejected']
+                .every(eventType => liveUpdates.on(eventType, refresh));
+            if (streaming) return;
+        }
+
+        // Fall back to polling every 30 seconds if the browser can't stream
         setInterval(() => {
             this.checkForTradeUpdates();
         }, 30000);
@@ -1,8 +1,16 @@
 import json
 import os
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from markupsafe import escape
+from store import atomic_write_json, store_lock, store_generation
 
 STATS_FILE = "farm_stats.json"
 
+# Matchdays shown per page of match history
+HISTORY_PAGE_SIZE = 10
+
 def load_stats():
     if not os.path.exists(STATS_FILE):
         with open(STATS_FILE, "w") as f:
@@ -12,8 +20,7 @@ def load_stats():
         return json.load(f)
 
 def save_stats(data):
-    with open(STATS_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    atomic_write_json(STATS_FILE, data)
 
 def get_user_stats(username):
     data = load_stats()
@@ -24,9 +31,15 @@ def get_user_stats(username):
     })
 
 def update_user_stats(username, user_stats):
-    data = load_stats()
-    data["users"][username] = user_stats
-    save_stats(data)
+    """Save one user's stats; the file is shared, so this holds the store lock.
+
+    Callers that read the user's stats first should hold store_lock() across
+    the read too, or a trade committed in between is lost.
+    """
+    with store_lock():
+        data = load_stats()
+        data["users"][username] = user_stats
+        save_stats(data)
 
 def get_global_farmer_stats():
     """Get performance statistics for all farmers across all teams"""
@@ -70,122 +83,214 @@ def get_global_farmer_stats():
     farmer_list.sort(key=lambda x: x["total_points"], reverse=True)
     return farmer_list
 
-def get_match_stats_html(username):
+def new_farmer_totals():
+    return {"points": 0, "matchdays": 0, "injuries": 0, "injury_points": 0, "job": "N/A"}
+
+def fold_matchday_totals(farmer_totals, entry):
+    """Add one matchday entry to per-farmer totals and stamp its cumulative columns"""
+    for farmer in entry["farmers"]:
+        totals = farmer_totals.setdefault(farmer["name"], new_farmer_totals())
+        totals["points"] += farmer["points_after_catastrophe"]
+        totals["matchdays"] += 1
+        totals["injuries"] += farmer.get("injuries_this_season", 0)
+        totals["injury_points"] += farmer.get("injury_points_lost", 0)
+        totals["job"] = farmer["job"]
+
+        farmer["cumulative_injuries"] = totals["injuries"]
+        farmer["cumulative_injury_points"] = totals["injury_points"]
+        farmer["avg_points"] = totals["points"] / totals["matchdays"]
+
+    entry["total_points"] = sum(farmer["points_after_catastrophe"] for farmer in entry["farmers"])
+
+def add_running_totals(user_data, entry):
+    """Fold a new matchday entry into the user's stored running totals.
+
+    Each farmer row gets its cumulative injury, injury point and average
+    columns stamped on it, so history can be rendered one day at a time.
+    Call this before appending the entry to user_data["data"].
+    """
+    history = user_data.get("data", [])
+    last_matchday = history[-1]["matchday"] if history else 0
+    if user_data.get("farmer_totals_through") != last_matchday or "farmer_totals" not in user_data:
+        # Missing or out of date (older data or a season reset), rebuild from history
+        user_data["farmer_totals"] = {}
+        for past_entry in history:
+            fold_matchday_totals(user_data["farmer_totals"], past_entry)
+
+    fold_matchday_totals(user_data["farmer_totals"], entry)
+    user_data["farmer_totals_through"] = entry["matchday"]
+
+def get_farmer_totals(user_data):
+    """Get running per-farmer totals, computing them in one pass for data saved before they existed"""
+    history = user_data.get("data", [])
+    last_matchday = history[-1]["matchday"] if history else 0
+    if user_data.get("farmer_totals_through") == last_matchday and "farmer_totals" in user_data:
+        return user_data["farmer_totals"]
+
+    farmer_totals = {}
+    for entry in history:
+        fold_matchday_totals(farmer_totals, entry)
+    return farmer_totals
+
+def get_entry_points(entry):
+    """Points scored on one matchday, using the stamped total when present"""
+    if "total_points" in entry:
+        return entry["total_points"]
+    return sum(farmer.get("points_after_catastrophe", 0) for farmer in entry.get("farmers", []))
+
+def get_cycle_points(user_data, cycle):
+    """Points scored over the three matchdays of a 0-indexed matchup cycle"""
+    start = cycle * 3
+    return sum(get_entry_points(entry) for entry in user_data.get("data", [])[start:start + 3])
+
+# Rendered matchday tables keyed by (username, matchday) -> (entry key, html), least recently used first
+FRAGMENT_CACHE_SIZE = 4096
+_fragment_cache = OrderedDict()
+_fragment_cache_lock = threading.Lock()
+_preferences_cache = {"generation": None, "preferences": {}}
+
+def load_farmer_crop_preferences():
+    """Load crop preferences once per version of the file"""
+    generation = store_generation("farmer_crop_preferences.json")
+    if _preferences_cache["generation"] != generation:
+        try:
+            with open("farmer_crop_preferences.json", "r") as f:
+                preferences = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            preferences = {}
+        _preferences_cache.update(generation=generation, preferences=preferences)
+    return _preferences_cache["preferences"]
+
+def get_fragment_key(entry, preferences_generation):
+    """Cheap identity for a matchday entry; it changes if the day was replayed after a reset"""
+    return (
+        entry["season"],
+        entry.get("daily_crop"),
+        tuple((f["name"], f["points_after_catastrophe"], f.get("cumulative_injury_points", 0)) for f in entry["farmers"]),
+        preferences_generation
+    )
+
+def render_matchday_fragment(entry, farmer_preferences):
+    """Render one matchday's history table"""
+    matchday = entry["matchday"]
+    season = entry["season"]
+    affected = entry["affected_farmer"]
+    daily_crop = entry.get('daily_crop', 'N/A').lower()
+
+    html = f"<h5>Matchday {matchday} — {season.title()}</h5>"
+    html += f"<p><strong>Daily Crop:</strong> {entry.get('daily_crop', 'N/A').title()}</p>"
+    html += "<table class='table table-sm table-bordered'><thead><tr>"
+    html += "<th>Name</th><th>Job</th><th>Total</th><th>Task Pts</th><th>Crop Pts</th><th>CatLoss</th><th>InjLoss</th><th>InjTot</th><th>InjPtTot</th><th>Avg</th></tr></thead><tbody>"
+
+    match_total = 0
+    for farmer in entry["farmers"]:
+        name = farmer["name"]
+        job = farmer["job"]
+        total_pts = farmer["points_after_catastrophe"]
+        crop_pts = farmer.get("crop_points", 0)
+        task_pts = total_pts - crop_pts  # Calculate task points by subtracting crop points from total
+        catlost = farmer.get("catastrophe_loss", 0)
+        injlost = farmer.get("daily_injury_loss", 0)
+
+        injtot = farmer.get("cumulative_injuries", 0)
+        injptot = farmer.get("cumulative_injury_points", 0)
+        avg = farmer.get("avg_points", 0.0)
+        cat_flag = "ABC" if affected == name else ""
+
+        # Add heart emoji if preferred crop for this season matches daily crop
+        heart_emoji = ""
+        if name in farmer_preferences:
+            preferred_crop = farmer_preferences[name].get(season.lower(), "").lower()
+            if preferred_crop == daily_crop:
+                heart_emoji = " ❤️"
+
+        html += f"<tr><td>{name}{heart_emoji}</td><td>{job}</td><td>{total_pts}</td><td>{task_pts}</td><td>{crop_pts}</td><td>{catlost} {cat_flag}</td><td>{injlost}</td><td>{injtot}</td><td>{injptot}</td><td>{avg:.2f}</td></tr>"
+        match_total += total_pts
+
+    html += "</tbody></table>"
+    html += f"<p><strong>Total points this matchday:</strong> {match_total}</p><hr>"
+    return html
+
+def get_matchday_fragment(username, entry, farmer_preferences, preferences_generation):
+    """Get a matchday's table from the fragment cache, rendering it only if new or changed"""
+    cache_key = (username, entry["matchday"])
+    fragment_key = get_fragment_key(entry, preferences_generation)
+    with _fragment_cache_lock:
+        cached = _fragment_cache.get(cache_key)
+        if cached and cached[0] == fragment_key:
+            _fragment_cache.move_to_end(cache_key)
+            return cached[1]
+
+    html = render_matchday_fragment(entry, farmer_preferences)
+    with _fragment_cache_lock:
+        _fragment_cache[cache_key] = (fragment_key, html)
+        _fragment_cache.move_to_end(cache_key)
+        while len(_fragment_cache) > FRAGMENT_CACHE_SIZE:
+            _fragment_cache.popitem(last=False)
+    return html
+
+def get_history_page(user_data, before=None, limit=HISTORY_PAGE_SIZE):
+    """Get up to `limit` matchday entries older than `before`, newest first.
+
+    Returns the page and the cursor for the next older page (None when
+    the start of the season has been reached).
+    """
+    history = user_data.get("data", [])
+    end = len(history) if before is None else bisect_left(history, before, key=lambda e: e["matchday"])
+    start = max(0, end - limit)
+    next_before = history[start]["matchday"] if start > 0 else None
+    return history[start:end][::-1], next_before
+
+def iter_history_fragments(username, entries):
+    """Yield the cached table fragment for each entry"""
+    farmer_preferences = load_farmer_crop_preferences()
+    preferences_generation = _preferences_cache["generation"]
+    for entry in entries:
+        yield get_matchday_fragment(username, entry, farmer_preferences, preferences_generation)
+
+def get_match_history_page(username, before=None, limit=HISTORY_PAGE_SIZE):
+    """Get one page of a user's rendered matchday history for the history API"""
     user_data = get_user_stats(username)
-    stats_data = user_data
-    html = ""
-
-    # Total points by farmer
-    final_totals = {}
-    final_matches = {}
-    final_jobs = {}
-    for entry in stats_data["data"]:
-        for farmer in entry["farmers"]:
-            name = farmer["name"]
-            job = farmer["job"]
-            pts = farmer["points_after_catastrophe"]
-            final_totals[name] = final_totals.get(name, 0) + pts
-            final_matches[name] = final_matches.get(name, 0) + 1
-            final_jobs[name] = job
-
-    html += "<h5>🏆 Total Points by Farmer</h5><ul>"
-    sorted_farmers = sorted(final_totals.items(), key=lambda x: x[1], reverse=True)
-    for farmer, total_pts in sorted_farmers:
-        job = final_jobs.get(farmer, "N/A")
-        html += f"<li><strong>{farmer}</strong>: {total_pts} points over {final_matches[farmer]} matchday(s) as {job}</li>"
+    # Stamps cumulative columns on history saved before running totals existed
+    get_farmer_totals(user_data)
+    entries, next_before = get_history_page(user_data, before, limit)
+    return {
+        "matchdays": [
+            {"matchday": entry["matchday"], "season": entry["season"], "html": html}
+            for entry, html in zip(entries, iter_history_fragments(username, entries))
+        ],
+        "next_before": next_before
+    }
+
+def get_farmer_totals_html(farmer_totals):
+    html = "<h5>🏆 Total Points by Farmer</h5><ul>"
+    sorted_farmers = sorted(farmer_totals.items(), key=lambda x: x[1]["points"], reverse=True)
+    for farmer, totals in sorted_farmers:
+        html += f"<li><strong>{farmer}</strong>: {totals['points']} points over {totals['matchdays']} matchday(s) as {totals['job']}</li>"
     html += "</ul>"
+    return html
+
+def get_match_stats_html(username, limit=None):
+    """Render the farmer totals and matchday history (only the newest `limit` days if given)"""
+    user_data = get_user_stats(username)
+    farmer_totals = get_farmer_totals(user_data)
 
+    html = get_farmer_totals_html(farmer_totals)
     html += "<h4>🌾 Farmington Matchday History</h4><hr>"
 
-    # Averages
-    farmer_totals = {}
-    farmer_matches = {}
-    matchday_avgs = {}
-
-    # First pass to calculate cumulative injuries per matchday
-    cumulative_injuries_by_day = {}
-    cumulative_injury_points_by_day = {}
-    running_injuries = {}
-    running_injury_points = {}
-
-    for entry in stats_data["data"]:
-        matchday = entry["matchday"]
-        cumulative_injuries_by_day[matchday] = {}
-        cumulative_injury_points_by_day[matchday] = {}
-        for farmer in entry["farmers"]:
-            name = farmer["name"]
-            inj = farmer.get("injuries_this_season", 0)
-            injpts = farmer.get("injury_points_lost", 0)
-            running_injuries[name] = running_injuries.get(name, 0) + inj
-            running_injury_points[name] = running_injury_points.get(name, 0) + injpts
-            cumulative_injuries_by_day[matchday][name] = running_injuries[name]
-            cumulative_injury_points_by_day[matchday][name] = running_injury_points[name]
-
-    # Second pass for rendering
-    for entry in stats_data["data"]:
-        matchday = entry["matchday"]
-        matchday_avgs[matchday] = {}
-        for farmer in entry["farmers"]:
-            name = farmer["name"]
-            pts = farmer["points_after_catastrophe"]
-            farmer_totals[name] = farmer_totals.get(name, 0) + pts
-            farmer_matches[name] = farmer_matches.get(name, 0) + 1
-            avg = farmer_totals[name] / farmer_matches[name]
-            matchday_avgs[matchday][name] = avg
-
-    for entry in reversed(stats_data["data"]):
-        matchday = entry["matchday"]
-        season = entry["season"]
-        affected = entry["affected_farmer"]
-        farmers = entry["farmers"]
-
-        html += f"<h5>Matchday {matchday} — {season.title()}</h5>"
-        html += f"<p><strong>Daily Crop:</strong> {entry.get('daily_crop', 'N/A').title()}</p>"
-        html += "<table class='table table-sm table-bordered'><thead><tr>"
-        html += "<th>Name</th><th>Job</th><th>Total</th><th>Task Pts</th><th>Crop Pts</th><th>CatLoss</th><th>InjLoss</th><th>InjTot</th><th>InjPtTot</th><th>Avg</th></tr></thead><tbody>"
-
-        match_total = 0
-        for farmer in farmers:
-            name = farmer["name"]
-            job = farmer["job"]
-            total_pts = farmer["points_after_catastrophe"]
-            crop_pts = farmer.get("crop_points", 0)
-            task_pts = total_pts - crop_pts  # Calculate task points by subtracting crop points from total
-            catlost = farmer.get("catastrophe_loss", 0)
-            injlost = farmer.get("daily_injury_loss", 0)
-
-            injtot = cumulative_injuries_by_day[matchday].get(name, 0)
-            injptot = cumulative_injury_points_by_day[matchday].get(name, 0)
-
-            avg = matchday_avgs[matchday].get(name, 0.0)
-            cat_flag = "ABC" if affected == name else ""
-
-            # Add heart emoji if preferred crop matches daily crop
-            heart_emoji = ""
-            daily_crop = entry.get('daily_crop', 'N/A').lower()
-            
-            # Load farmer crop preferences
-            try:
-                import json
-                with open('farmer_crop_preferences.json', 'r') as f:
-                    farmer_preferences = json.load(f)
-                
-                # Get current season from the entry
-                current_season = season.lower()
-                
-                # Check if farmer has a preference for this season that matches daily crop
-                if name in farmer_preferences:
-                    preferred_crop = farmer_preferences[name].get(current_season, "").lower()
-                    if preferred_crop == daily_crop:
-                        heart_emoji = " ❤️"
-            except:
-                pass  # If file doesn't exist or other error, just skip the heart emoji
-
-            html += f"<tr><td>{name}{heart_emoji}</td><td>{job}</td><td>{total_pts}</td><td>{task_pts}</td><td>{crop_pts}</td><td>{catlost} {cat_flag}</td><td>{injlost}</td><td>{injtot}</td><td>{injptot}</td><td>{avg:.2f}</td></tr>"
-            match_total += total_pts
-
-        html += "</tbody></table>"
-        html += f"<p><strong>Total points this matchday:</strong> {match_total}</p><hr>"
+    entries, next_before = get_history_page(user_data, limit=limit if limit is not None else len(user_data["data"]))
+    html += "".join(iter_history_fragments(username, entries))
 
-    return html
+    if next_before is not None:
+        html += (
+            f"<div class='match-history-older' data-username='{escape(username)}' data-before='{next_before}'>"
+            "<button type='button' class='btn btn-outline-secondary btn-sm load-older-matchdays'>"
+            "Load older matchdays</button></div>"
+        )
 
+    # Drop fragments for matchdays that no longer exist (season reset)
+    with _fragment_cache_lock:
+        for cache_key in [k for k in _fragment_cache if k[0] == username and k[1] > user_data.get("matchday", 0)]:
+            del _fragment_cache[cache_key]
+
+    return html
@@ -0,0 +1,164 @@
+import os
+import json
+import fcntl
+import hashlib
+import threading
+from contextlib import contextmanager
+
+# The league documents, shared by every module
+LEAGUES_FILE = "leagues.json"
+
+# Lock file serializing multi-store transactions, and the journal of an in-flight commit
+STORE_LOCK_FILE = ".store.lock"
+STORE_JOURNAL_FILE = "store_journal.json"
+
+# How deeply the current thread holds store_lock(), so helpers that lock can be called under it
+_lock_depth = threading.local()
+
+def store_generation(path):
+    """Get a cheap generation marker for a JSON store.
+
+    Every save rewrites the whole file, so its modification time and size
+    change with each write. The mtime clock is coarse, so two same-size
+    writes in one tick can look alike; atomic writes replace the file, so
+    its inode number tells them apart. Reading them is a single stat call,
+    which also sees writes made by other processes (core.py runs as a
+    subprocess).
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return "0"
+    return f"{st.st_mtime_ns:x}.{st.st_size:x}.{st.st_ino:x}"
+
+def data_version(*paths):
+    """Combine the generations of several stores into one version string"""
+    return "-".join(store_generation(path) for path in paths)
+
+def make_etag(*parts):
+    """Build an opaque ETag value from version strings and request identity"""
+    return hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+def atomic_write_json(path, data):
+    """Write a JSON store so readers see either the old or the new file, never a partial one"""
+    # Unique per writer, so two threads saving the same store can't share a temp file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def atomic_write_jsonl(path, records):
+    """Rewrite a JSON Lines log so readers see either the old or the new file"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write("".join(json.dumps(record) + "\n" for record in records))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def load_leagues():
+    try:
+        with open(LEAGUES_FILE, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def save_leagues(leagues):
+    atomic_write_json(LEAGUES_FILE, leagues)
+
+def _append_records(path, records):
+    """Append JSON Lines records unless the last one is already at the end of the file"""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 65536))
+            lines = [line for line in f.read().split(b"\n") if line.strip()]
+        if lines and json.loads(lines[-1]).get("id") == records[-1].get("id"):
+            return
+    except FileNotFoundError:
+        pass
+
+    with open(path, "a") as f:
+        f.write("".join(json.dumps(record) + "\n" for record in records))
+        f.flush()
+        os.fsync(f.fileno())
+
+def _apply_journal(journal):
+    """Roll a journaled commit forward; steps already done are skipped"""
+    for path in journal["writes"]:
+        try:
+            os.replace(f"{path}.pending", path)
+        except FileNotFoundError:
+            pass
+    for path, records in journal["appends"].items():
+        _append_records(path, records)
+    try:
+        os.remove(STORE_JOURNAL_FILE)
+    except FileNotFoundError:
+        pass
+
+def recover_journal():
+    """Finish a commit that was interrupted after its journal was written.
+
+    Call while holding store_lock(), which does this on every acquire.
+    """
+    try:
+        with open(STORE_JOURNAL_FILE, "r") as f:
+            journal = json.load(f)
+    except FileNotFoundError:
+        return False
+    except json.JSONDecodeError:
+        # The journal itself was never completed, so nothing was applied
+        try:
+            os.remove(STORE_JOURNAL_FILE)
+        except FileNotFoundError:
+            pass
+        return False
+    _apply_journal(journal)
+    return True
+
+@contextmanager
+def store_lock():
+    """Hold the store transaction lock (across threads and processes).
+
+    Re-entrant within a thread: a nested store_lock() just joins the
+    outer one.
+    """
+    depth = getattr(_lock_depth, "value", 0)
+    if depth:
+        _lock_depth.value = depth + 1
+        try:
+            yield
+        finally:
+            _lock_depth.value = depth
+        return
+
+    with open(STORE_LOCK_FILE, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        _lock_depth.value = 1
+        try:
+            recover_journal()
+            yield
+        finally:
+            _lock_depth.value = 0
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def commit(writes, appends=None):
+    """Atomically replace several JSON stores and append to JSON Lines logs.
+
+    New contents are staged next to each store, then a journal naming them
+    is written; once the journal exists the commit is rolled forward even
+    if the process dies part way. A .jsonl path in `writes` is replaced by
+    the given list of records. Call while holding store_lock().
+    """
+    appends = appends or {}
+    for path, data in writes.items():
+        if path.endswith(".jsonl"):
+            atomic_write_jsonl(f"{path}.pending", data)
+        else:
+            atomic_write_json(f"{path}.pending", data)
+
+    atomic_write_json(STORE_JOURNAL_FILE, {"writes": list(writes), "appends": appends})
+    _apply_journal({"writes": list(writes), "appends": appends})
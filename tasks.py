@@ -1,5 +1,61 @@
 import random
 import subprocess
+from itertools import product
+
+# Dice each job's tasks roll in get_task_for_job: one list per task (all
+# equally likely), holding (stat, low, high) for every roll that must come
+# in under the farmer's stat. Keep in step with get_task_for_job.
+TASK_ROLLS = {
+    "Lift Tender": [
+        [("strength", 4, 15)],
+        [("strength", 2, 13)],
+        [("strength", 1, 16), ("stamina", 2, 10)]
+    ],
+    "Fix Meiser": [
+        [("handy", 3, 15)],
+        [("handy", 3, 12)],
+        [("handy", 3, 15)]
+    ],
+    "Speed Runner": [
+        [("stamina", 2, 14)],
+        [("stamina", 1, 12)],
+        [("stamina", 1, 12)],
+        [("stamina", 6, 14)]
+    ]
+}
+
+_task_distributions = {}
+
+def get_task_points_distribution(job, strength, handy, stamina):
+    """Exact (points, cumulative weights) of get_task_for_job's points, for random.choices"""
+    key = (job, strength, handy, stamina)
+    if key in _task_distributions:
+        return _task_distributions[key]
+
+    farmer_stats = {"strength": strength, "handy": handy, "stamina": stamina}
+    weights = {}
+    for task in TASK_ROLLS.get(job, []):
+        task_weight = 1 / len(TASK_ROLLS[job])
+        for low_high in task:
+            task_weight /= low_high[2] - low_high[1] + 1
+        for rolls in product(*(range(low, high + 1) for _, low, high in task)):
+            margins = [farmer_stats[stat] - roll for (stat, _, _), roll in zip(task, rolls)]
+            points = 1 + sum(margins) if all(margin > 0 for margin in margins) else 0
+            weights[points] = weights.get(points, 0) + task_weight
+
+    if not weights:
+        # Bench roles never score
+        weights = {0: 1}
+
+    points = sorted(weights)
+    cum_weights = []
+    running = 0
+    for value in points:
+        running += weights[value]
+        cum_weights.append(running)
+
+    _task_distributions[key] = (points, cum_weights)
+    return points, cum_weights
 
 
 def get_task_for_job(job, strength, handy, stamina, name, other_names):
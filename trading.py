@@ -2,27 +2,156 @@ import json
 import os
 import uuid
 from datetime import datetime
-from stats import get_user_stats, update_user_stats
+from stats import STATS_FILE, get_user_stats, load_stats
+from ownership import get_ownership_file, load_ownership_index, apply_team_ownership
+from store import store_generation, store_lock, commit
 
 TRADES_FILE = "trades.json"
+STORY_FILE = "story.json"
+# Resolved trades, one JSON object per line, appended as trades are accepted or rejected
+TRADES_ARCHIVE_FILE = "trades_archive.jsonl"
+# Trade listings only read this many of the most recent archived trades
+TRADE_HISTORY_LIMIT = 500
+# Bytes read per step when scanning the archive backwards
+ARCHIVE_READ_BLOCK_SIZE = 65536
+
+def read_archive_tail(path, limit):
+    """The last `limit` records of a JSON Lines archive, oldest first, reading from the end"""
+    records = []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        while position > 0 and len(records) < limit:
+            step = min(ARCHIVE_READ_BLOCK_SIZE, position)
+            position -= step
+            f.seek(position)
+            lines = (f.read(step) + remainder).split(b"\n")
+            # The first piece may be a partial line; finish it on the next block
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip() and len(records) < limit:
+                    records.append(json.loads(line))
+        if position == 0 and remainder.strip() and len(records) < limit:
+            records.append(json.loads(remainder))
+    records.reverse()
+    return records
+
+def index_trades(trades):
+    """Build id, (to_user, status), from_user and per-user lookups over a list of trades"""
+    index = {"by_id": {}, "by_recipient": {}, "by_sender": {}, "by_user": {}}
+    for trade in trades:
+        index["by_id"][trade["id"]] = trade
+        index["by_recipient"].setdefault((trade["to_user"], trade["status"]), []).append(trade)
+        index["by_sender"].setdefault(trade["from_user"], []).append(trade)
+        index["by_user"].setdefault(trade["from_user"], []).append(trade)
+        if trade["to_user"] != trade["from_user"]:
+            index["by_user"].setdefault(trade["to_user"], []).append(trade)
+    return index
 
 class TradingManager:
+    """Trade store split into a small active segment and an append-only archive.
+
+    trades.json only holds pending trades; resolved trades are moved to the
+    archive. Both segments are indexed in memory and re-read only when
+    their file changes. Every write goes through commit() under the store
+    lock, like accept_trade, so writers never interleave.
+    """
+
     def __init__(self):
         self.trades_file = TRADES_FILE
-    
-    def load_trades(self):
-        if not os.path.exists(self.trades_file):
-            return []
-        with open(self.trades_file, "r") as f:
+        self.archive_file = TRADES_ARCHIVE_FILE
+        self._segments = {}
+
+    def _load_segment(self, path, reader):
+        """Get (trades, index) for a segment, reusing the cached copy while the file is unchanged"""
+        generation = store_generation(path)
+        cached = self._segments.get(path)
+        if cached and cached[0] == generation:
+            return cached[1], cached[2]
+
+        trades = reader(path) if generation != "0" else []
+        index = index_trades(trades)
+        self._segments[path] = (generation, trades, index)
+        return trades, index
+
+    def _read_active(self, path):
+        with open(path, "r") as f:
             return json.load(f)
-    
-    def save_trades(self, trades):
-        with open(self.trades_file, "w") as f:
-            json.dump(trades, f, indent=4)
+
+    def _read_archive(self, path):
+        return read_archive_tail(path, TRADE_HISTORY_LIMIT)
+
+    def _read_full_archive(self):
+        try:
+            with open(self.archive_file, "r") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def load_active_trades(self):
+        """Pending trades and their index (older files may still hold resolved trades)"""
+        trades, index = self._load_segment(self.trades_file, self._read_active)
+        if any(trade["status"] != "pending" for trade in trades):
+            # Rotate resolved trades out of a pre-archive trades.json
+            with store_lock():
+                trades, _ = self._load_segment(self.trades_file, self._read_active)
+                resolved = [t for t in trades if t["status"] != "pending"]
+                if resolved:
+                    commit({self.trades_file: [t for t in trades if t["status"] == "pending"]},
+                           appends={self.archive_file: resolved})
+                trades, index = self._load_segment(self.trades_file, self._read_active)
+        return trades, index
+
+    def load_archived_trades(self):
+        """The most recent TRADE_HISTORY_LIMIT archived trades and their index"""
+        return self._load_segment(self.archive_file, self._read_archive)
+
+
+    def load_trades(self):
+        """All trades, pending and resolved"""
+        active, _ = self.load_active_trades()
+        return self._read_full_archive() + active
+
+    def remove_user_trades(self, usernames):
+        """Delete every trade (pending or archived) involving any of the given users"""
+        usernames = set(usernames)
+
+        def keep(trade):
+            return trade["from_user"] not in usernames and trade["to_user"] not in usernames
+
+        with store_lock():
+            active, _ = self.load_active_trades()
+            archived = self._read_full_archive()
+            commit({
+                self.trades_file: [t for t in active if keep(t)],
+                self.archive_file: [t for t in archived if keep(t)]
+            })
+
+    def _resolve_trade(self, trade_id, status):
+        """Mark a pending trade resolved and move it from the active segment to the archive.
+
+        Returns False if the trade is no longer pending (e.g. it was just accepted).
+        """
+        with store_lock():
+            active, index = self.load_active_trades()
+            trade = index["by_id"].get(trade_id)
+            if not trade or trade["status"] != "pending":
+                return False
+
+            # Copy so the cached active segment never holds a resolved trade
+            resolved = dict(trade, status=status, responded_at=datetime.now().isoformat())
+            commit({self.trades_file: [t for t in active if t["id"] != trade_id]},
+                   appends={self.archive_file: [resolved]})
+        return True
     
     def propose_trade(self, from_user, to_user, offered_farmer_name, requested_farmer_name, message=""):
         """Create a new trade proposal based on specific farmer names"""
-        trades = self.load_trades()
+        with store_lock():
+            return self._propose_trade(from_user, to_user, offered_farmer_name, requested_farmer_name, message)
+
+    def _propose_trade(self, from_user, to_user, offered_farmer_name, requested_farmer_name, message):
+        trades, _ = self.load_active_trades()
         
         # Get farmer details
         from_user_data = get_user_stats(from_user)
@@ -68,139 +197,139 @@ class TradingManager:
             "responded_at": None
         }
         
-        trades.append(trade)
-        self.save_trades(trades)
+        commit({self.trades_file: trades + [trade]})
         return True
     
-    def accept_trade(self, trade_id, accepting_user):
-        """Accept a trade proposal and execute the swap"""
-        trades = self.load_trades()
-        
-        trade = None
-        for t in trades:
-            if t["id"] == trade_id and t["to_user"] == accepting_user and t["status"] == "pending":
-                trade = t
-                break
-        
-        if not trade:
-            return False
-        
-        # Execute the trade
-        from_user_data = get_user_stats(trade["from_user"])
-        to_user_data = get_user_stats(trade["to_user"])
-        
-        # Get current teams
-        from_user_team = from_user_data.get("drafted_team", {})
-        to_user_team = to_user_data.get("drafted_team", {})
-        
-        # Validate that the exact farmers mentioned in the trade are still available
-        # Find the offered farmer by name in from_user's current team
-        offered_farmer = None
-        offered_role = None
-        for role, farmer_data in from_user_team.items():
-            if farmer_data and farmer_data.get("name") == trade["offered_farmer_name"]:
-                offered_farmer = farmer_data
-                offered_role = role
-                break
-        
-        # Find the requested farmer by name in to_user's current team
-        requested_farmer = None
-        requested_role = None
-        for role, farmer_data in to_user_team.items():
-            if farmer_data and farmer_data.get("name") == trade["requested_farmer_name"]:
-                requested_farmer = farmer_data
-                requested_role = role
-                break
-        
-        # If either farmer is no longer available or has been changed, reject the trade
-        if not offered_farmer or not requested_farmer:
-            return False
-        
-        # Preserve injury data during the trade
-        self._preserve_injury_data(trade["offered_farmer_name"], trade["requested_farmer_name"])
-        
-        # Perform the swap using the current roles where these farmers are located
-        from_user_team[offered_role] = requested_farmer
-        to_user_team[requested_role] = offered_farmer
-        
-        # Update user stats
-        update_user_stats(trade["from_user"], from_user_data)
-        update_user_stats(trade["to_user"], to_user_data)
-        
-        # Mark trade as completed
-        trade["status"] = "accepted"
-        trade["responded_at"] = datetime.now().isoformat()
-        
-        self.save_trades(trades)
+    def accept_trade(self, trade_id, accepting_user, league=None):
+        """Accept a trade proposal and execute the swap as one atomic commit.
+
+        Both teams, the league's ownership index, injury state and the trade
+        record are staged in memory and written together, under the store
+        lock so concurrent acceptances can't interleave.
+        """
+        with store_lock():
+            active, index = self.load_active_trades()
+            
+            trade = index["by_id"].get(trade_id)
+            if not trade or trade["to_user"] != accepting_user or trade["status"] != "pending":
+                return False
+            
+            # One stats snapshot for both sides of the trade
+            all_stats = load_stats()
+            from_user_team = all_stats["users"].get(trade["from_user"], {}).get("drafted_team", {})
+            to_user_team = all_stats["users"].get(trade["to_user"], {}).get("drafted_team", {})
+            
+            # Validate that the exact farmers mentioned in the trade are still available
+            # Find the offered farmer by name in from_user's current team
+            offered_farmer = None
+            offered_role = None
+            for role, farmer_data in from_user_team.items():
+                if farmer_data and farmer_data.get("name") == trade["offered_farmer_name"]:
+                    offered_farmer = farmer_data
+                    offered_role = role
+                    break
+            
+            # Find the requested farmer by name in to_user's current team
+            requested_farmer = None
+            requested_role = None
+            for role, farmer_data in to_user_team.items():
+                if farmer_data and farmer_data.get("name") == trade["requested_farmer_name"]:
+                    requested_farmer = farmer_data
+                    requested_role = role
+                    break
+            
+            # If either farmer is no longer available or has been changed, reject the trade
+            if not offered_farmer or not requested_farmer:
+                return False
+            
+            # Perform the swap using the current roles where these farmers are located
+            from_user_team[offered_role] = requested_farmer
+            to_user_team[requested_role] = offered_farmer
+            
+            writes = {STATS_FILE: all_stats}
+            
+            # Preserve injury data during the trade
+            story_data = self._preserve_injury_data(trade["offered_farmer_name"], trade["requested_farmer_name"])
+            if story_data is not None:
+                writes[STORY_FILE] = story_data
+            
+            if league:
+                ownership = apply_team_ownership(load_ownership_index(league["code"], league["players"]), {
+                    trade["from_user"]: from_user_team,
+                    trade["to_user"]: to_user_team
+                })
+                writes[get_ownership_file(league["code"])] = ownership
+            
+            # Mark trade as completed: out of the active segment, into the archive
+            resolved = dict(trade, status="accepted", responded_at=datetime.now().isoformat())
+            writes[self.trades_file] = [t for t in active if t["id"] != trade_id]
+            
+            commit(writes, appends={self.archive_file: [resolved]})
         return True
     
     def _preserve_injury_data(self, farmer1_name, farmer2_name):
-        """Preserve injury data when farmers are traded"""
+        """Get story data with injury state carried over for traded farmers (None if unavailable)"""
         try:
             # Load story data to get current miss_days
-            story_file = "story.json"
-            if os.path.exists(story_file):
-                with open(story_file, "r") as f:
-                    story_data = json.load(f)
-                
-                # Collect injury data for both farmers across all users
-                farmer1_miss_days = 0
-                farmer2_miss_days = 0
+            if not os.path.exists(STORY_FILE):
+                return None
+            with open(STORY_FILE, "r") as f:
+                story_data = json.load(f)
+            
+            # Collect injury data for both farmers across all users
+            farmer1_miss_days = 0
+            farmer2_miss_days = 0
+            
+            for username, user_story in story_data.items():
+                miss_days = user_story.get("miss_days", {})
+                if farmer1_name in miss_days:
+                    farmer1_miss_days = max(farmer1_miss_days, miss_days[farmer1_name])
+                if farmer2_name in miss_days:
+                    farmer2_miss_days = max(farmer2_miss_days, miss_days[farmer2_name])
+            
+            # Update story data for all users to reflect the trade
+            for username, user_story in story_data.items():
+                miss_days = user_story.get("miss_days", {})
                 
-                for username, user_story in story_data.items():
-                    miss_days = user_story.get("miss_days", {})
-                    if farmer1_name in miss_days:
-                        farmer1_miss_days = max(farmer1_miss_days, miss_days[farmer1_name])
-                    if farmer2_name in miss_days:
-                        farmer2_miss_days = max(farmer2_miss_days, miss_days[farmer2_name])
-                
-                # Update story data for all users to reflect the trade
-                for username, user_story in story_data.items():
-                    miss_days = user_story.get("miss_days", {})
-                    
-                    # Update miss_days for both farmers
-                    if farmer1_name in miss_days or farmer1_miss_days > 0:
-                        miss_days[farmer1_name] = farmer1_miss_days
-                    if farmer2_name in miss_days or farmer2_miss_days > 0:
-                        miss_days[farmer2_name] = farmer2_miss_days
-                    
-                    user_story["miss_days"] = miss_days
+                # Update miss_days for both farmers
+                if farmer1_name in miss_days or farmer1_miss_days > 0:
+                    miss_days[farmer1_name] = farmer1_miss_days
+                if farmer2_name in miss_days or farmer2_miss_days > 0:
+                    miss_days[farmer2_name] = farmer2_miss_days
                 
-                # Save updated story data
-                with open(story_file, "w") as f:
-                    json.dump(story_data, f, indent=4)
+                user_story["miss_days"] = miss_days
+            
+            return story_data
                     
         except Exception as e:
             print(f"Error preserving injury data during trade: {e}")
             # Don't fail the trade if injury preservation fails
+            return None
     
     def reject_trade(self, trade_id):
         """Reject a trade proposal"""
-        trades = self.load_trades()
-        
-        for trade in trades:
-            if trade["id"] == trade_id and trade["status"] == "pending":
-                trade["status"] = "rejected"
-                trade["responded_at"] = datetime.now().isoformat()
-                break
-        
-        self.save_trades(trades)
+        self._resolve_trade(trade_id, "rejected")
         return True
     
     def get_incoming_trades(self, username):
         """Get pending trade proposals sent to this user"""
-        trades = self.load_trades()
-        return [t for t in trades if t["to_user"] == username and t["status"] == "pending"]
+        _, index = self.load_active_trades()
+        return list(index["by_recipient"].get((username, "pending"), []))
     
     def get_outgoing_trades(self, username):
-        """Get trade proposals sent by this user"""
-        trades = self.load_trades()
-        return [t for t in trades if t["from_user"] == username and t["status"] in ["pending", "accepted", "rejected"]]
+        """Get trade proposals sent by this user (archived ones from the recent history only)"""
+        _, active_index = self.load_active_trades()
+        _, archive_index = self.load_archived_trades()
+        trades = archive_index["by_sender"].get(username, []) + active_index["by_sender"].get(username, [])
+        trades = [t for t in trades if t["status"] in ["pending", "accepted", "rejected"]]
+        return sorted(trades, key=lambda t: t["created_at"])
     
     def get_trade_history(self, username):
-        """Get all trades involving this user"""
-        trades = self.load_trades()
-        return [t for t in trades if t["from_user"] == username or t["to_user"] == username]
+        """Get trades involving this user (archived ones from the recent history only)"""
+        _, active_index = self.load_active_trades()
+        _, archive_index = self.load_archived_trades()
+        trades = archive_index["by_user"].get(username, []) + active_index["by_user"].get(username, [])
+        return sorted(trades, key=lambda t: t["created_at"])
 
 if __name__ == "__main__":
     # Test the trading system